@@ -27,21 +27,42 @@ from .control import (
     optional_control,
 )
 from .message import Adapter, Channel, Instrument, MessageProtocol
+from .poller import Poller, Sample
+from .retry import RetryPolicy, RetryStats
+from .scheduler import IOScheduler, Priority, priority
+from .stability import StabilityDetector, wait_until_stable
+from .status import StatusEvent, StatusMonitor, StatusRegister, claim_events, forward_events
+from .sweep import Sweep, settle_complete, settle_stable, settle_time, settle_tolerance
+from .timeout import AdaptiveTimeout
 from .virtual import default_registry, inject_real, inject_virtual, is_virtual, make_virtual
 
 __all__ = [
     'Adapter',
+    'AdaptiveTimeout',
     'BoolFormat',
     'Channel',
+    'IOScheduler',
     'Instrument',
     'MessageProtocol',
+    'Poller',
+    'Priority',
+    'RetryPolicy',
+    'RetryStats',
+    'Sample',
+    'StabilityDetector',
+    'StatusEvent',
+    'StatusMonitor',
+    'StatusRegister',
+    'Sweep',
     'always',
     'basic_control',
     'bool_control',
+    'claim_events',
     'convert_registry',
     'default_registry',
     'enum_control',
     'flag_control',
+    'forward_events',
     'ignore',
     'inject_real',
     'inject_virtual',
@@ -50,4 +71,10 @@ __all__ = [
     'make_virtual',
     'noop',
     'optional_control',
+    'priority',
+    'settle_complete',
+    'settle_stable',
+    'settle_time',
+    'settle_tolerance',
+    'wait_until_stable',
 ]
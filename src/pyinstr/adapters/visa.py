@@ -6,17 +6,40 @@ This file is part of PyINSTR.
 """
 
 import logging
+import math
+from collections.abc import Callable, Hashable
 from enum import Enum
 from typing import Any, TypedDict, Unpack, override
 
+import numpy as np
 from pyvisa import ResourceManager
-from pyvisa.constants import ControlFlow, Parity, StopBits
+from pyvisa.constants import (
+    VI_TMO_INFINITE,
+    ControlFlow,
+    EventMechanism,
+    EventType,
+    InterfaceType,
+    Parity,
+    StatusCode,
+    StopBits,
+)
+from pyvisa.errors import VisaIOError
 from pyvisa.resources import MessageBasedResource
 
 from pyinstr import Adapter
 
 log = logging.getLogger(__name__)
 
+# errors after which repeating the transaction may succeed
+_TRANSIENT_CODES = frozenset(
+    {
+        StatusCode.error_timeout,
+        StatusCode.error_io,
+        StatusCode.error_connection_lost,
+        StatusCode.error_resource_busy,
+    }
+)
+
 
 class VISAOptionDict(TypedDict, total=False):
     timeout: int
@@ -37,6 +60,7 @@ class VISAAdapter(Adapter):
         if not isinstance(resource, MessageBasedResource):
             raise ValueError('The specified resource is not message based.')
         self._resource = resource
+        self._srq_handlers: dict[Callable[[], None], tuple[Callable[..., StatusCode], Any]] = {}
 
     @classmethod
     def make_gpib[T: VISAAdapter](
@@ -119,6 +143,98 @@ class VISAAdapter(Adapter):
                     type {self._resource.interface_type.name}."""
                 )
 
+    @property
+    @override
+    def bus(self) -> Hashable | None:
+        """GPIB resources share the bus of their board, all other resources are independent."""
+        name = self._resource.resource_name.upper()
+        interface = name.split('::', 1)[0]
+        if interface.startswith('GPIB'):
+            return 'GPIB0' if interface == 'GPIB' else interface
+        return name
+
+    @property
+    @override
+    def timeout(self) -> float | None:
+        timeout = self._resource.timeout
+        return math.inf if timeout is None else timeout / 1000.0
+
+    @timeout.setter
+    @override
+    def timeout(self, timeout: float) -> None:
+        self._resource.timeout = None if math.isinf(timeout) else timeout * 1000.0
+
+    @override
+    def is_transient(self, exc: BaseException) -> bool:
+        if isinstance(exc, VisaIOError):
+            return exc.error_code in _TRANSIENT_CODES
+        return super().is_transient(exc)
+
+    @override
+    def clear(self) -> None:
+        """Send a device clear, which also discards the buffers of the session."""
+        self._resource.clear()
+
+    @property
+    @override
+    def supports_binary(self) -> bool:
+        return True
+
+    @override
+    def read_block(self) -> bytes:
+        data = self._resource.read_binary_values(datatype='B', container=np.ndarray, expect_termination=True)
+        return data.tobytes()
+
+    @override
+    def write_block(self, command: str, data: bytes) -> None:
+        length = str(len(data))
+        header = f'#{len(length)}{length}'.encode('ascii')
+        self._resource.write_raw(command.encode('ascii') + header + data + self._resource.write_termination.encode())
+
+    @property
+    @override
+    def supports_srq(self) -> bool:
+        """Service requests are supported by GPIB and USBTMC instruments."""
+        resource = self._resource
+        return resource.resource_class == 'INSTR' and resource.interface_type in (InterfaceType.gpib, InterfaceType.usb)
+
+    @override
+    def enable_srq(self) -> None:
+        self._resource.enable_event(EventType.service_request, EventMechanism.queue)
+        self._resource.discard_events(EventType.service_request, EventMechanism.queue)
+
+    @override
+    def disable_srq(self) -> None:
+        self._resource.disable_event(EventType.service_request, EventMechanism.queue)
+
+    @override
+    def wait_srq(self, timeout: float | None = None) -> bool:
+        timeout_ms = VI_TMO_INFINITE if timeout is None else max(int(timeout * 1000.0), 0)
+        response = self._resource.wait_on_event(EventType.service_request, timeout_ms, capture_timeout=True)
+        return not response.timed_out
+
+    @override
+    def read_stb(self) -> int:
+        return self._resource.read_stb()
+
+    @override
+    def install_srq_handler(self, handler: Callable[[], None]) -> None:
+        def visa_handler(_resource: Any, _event: Any, _user_handle: Any) -> StatusCode:
+            handler()
+            return StatusCode.success
+
+        user_handle = self._resource.install_handler(EventType.service_request, visa_handler)
+        if not self._srq_handlers:
+            self._resource.enable_event(EventType.service_request, EventMechanism.handler)
+        self._srq_handlers[handler] = (visa_handler, user_handle)
+
+    @override
+    def uninstall_srq_handler(self, handler: Callable[[], None]) -> None:
+        visa_handler, user_handle = self._srq_handlers.pop(handler)
+        if not self._srq_handlers:
+            self._resource.disable_event(EventType.service_request, EventMechanism.handler)
+        self._resource.uninstall_handler(EventType.service_request, visa_handler, user_handle)
+
     def __str__(self) -> str:
         name = self._resource.resource_info.resource_name
         return name if name is not None else ''
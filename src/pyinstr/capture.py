@@ -0,0 +1,293 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from pathlib import Path
+from queue import SimpleQueue
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr.message import MessageProtocol
+from pyinstr.poller import Sample
+from pyinstr.tree import find_control
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+MAGIC = b'PYINSTRC'
+VERSION = 1
+# magic, version, header size, record count, metadata length
+_HEADER = struct.Struct('<8sIIQI')
+_COUNT_OFFSET = 16
+
+
+def record_dtype(fields: Sequence[str]) -> np.dtype[Any]:
+    """Record layout of a capture: an int64 timestamp in nanoseconds followed by float64 fields."""
+    return np.dtype([('timestamp', '<i8'), *((name, '<f8') for name in fields)])
+
+
+def _header_size(metadata: bytes) -> int:
+    # keep the records aligned to the mapping granularity of the platform
+    size = _HEADER.size + len(metadata)
+    granularity = mmap.ALLOCATIONGRANULARITY
+    return (size + granularity - 1) // granularity * granularity
+
+
+class CaptureWriter:
+    """Append timestamped samples to a chunked binary capture file.
+
+    The file consists of a header with the metadata (instrument identity, control path, units and
+    fields) and the number of valid records, followed by fixed-width records. Records are written
+    into memory-mapped chunks which are allocated as the capture grows. The record count in the
+    header is updated after the records, so a crash never exposes partially written records.
+
+    Appending only puts the data into a queue, the file is written by a background thread.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        fields: Sequence[str] = ('value',),
+        identity: str = '',
+        control: str = '',
+        units: str | Sequence[str] = '',
+        metadata: dict[str, Any] | None = None,
+        chunk_records: int = 1 << 16,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self._path = Path(path)
+        self._dtype = record_dtype(fields)
+        self._chunk_records = chunk_records
+        self._flush_interval = flush_interval
+        units = [units] * len(fields) if isinstance(units, str) else list(units)
+        if len(units) != len(fields):
+            raise ValueError('The number of units and fields differ.')
+        info = {
+            'identity': identity,
+            'control': control,
+            'fields': list(fields),
+            'units': units,
+            'created': datetime.now(UTC).isoformat(),
+            **({} if metadata is None else metadata),
+        }
+        encoded = json.dumps(info).encode()
+        self._header_size = _header_size(encoded)
+        self._count = 0
+        self._capacity = 0
+        self._map: mmap.mmap | None = None
+        self._map_offset = 0
+
+        self._file = open(self._path, 'w+b')
+        self._file.truncate(self._header_size)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self._header_size, 0, len(encoded)))
+        self._file.write(encoded)
+        self._file.flush()
+        self._header = mmap.mmap(self._file.fileno(), _HEADER.size)
+
+        self._queue: SimpleQueue[npt.NDArray[Any] | None] = SimpleQueue()
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name=f'pyinstr-capture-{self._path.name}', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def for_control(
+        cls,
+        path: str | os.PathLike[str],
+        target: MessageProtocol,
+        control: str,
+        units: str = '',
+        **kwargs: Any,
+    ) -> Self:
+        """Create a capture for a single control, recording the identity of its instrument."""
+        node = find_control(target, control)
+        try:
+            identity = str(getattr(node.root, 'identity', ''))
+        except Exception:
+            identity = ''
+        return cls(path, ('value',), identity=identity, control=node.name, units=units, **kwargs)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def dtype(self) -> np.dtype[Any]:
+        return self._dtype
+
+    @property
+    def count(self) -> int:
+        """Number of records written to the file."""
+        return self._count
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise RuntimeError('Writing the capture failed.') from self._error
+
+    def append(self, values: float | Sequence[float], timestamp: int | None = None) -> None:
+        """Queue a single record, the timestamp is given in nanoseconds (default: now)."""
+        self._check()
+        record = np.empty(1, dtype=self._dtype)
+        record['timestamp'] = time.time_ns() if timestamp is None else timestamp
+        for name, value in zip(self._dtype.names[1:], np.atleast_1d(values), strict=True):  # type: ignore[index]
+            record[name] = value
+        self._queue.put(record)
+
+    def append_sample(self, sample: Sample) -> None:
+        """Queue a polled sample, usable as listener of a :class:`pyinstr.Poller`."""
+        try:
+            value = float(sample.value)
+        except (TypeError, ValueError):
+            value = np.nan
+        self.append(value, int(sample.timestamp * 1e9))
+
+    def extend(self, values: npt.ArrayLike, timestamps: npt.ArrayLike) -> None:
+        """Queue many records, with one row (or value) per timestamp."""
+        self._check()
+        times = np.asarray(timestamps, dtype=np.int64).ravel()
+        data = np.asarray(values, dtype=np.float64).reshape(times.size, -1)
+        records = np.empty(times.size, dtype=self._dtype)
+        records['timestamp'] = times
+        for column, name in enumerate(self._dtype.names[1:]):  # type: ignore[index]
+            records[name] = data[:, column]
+        self._queue.put(records)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if not self._file.closed:
+            self._file.truncate(self._header_size + self._count * self._dtype.itemsize)
+            self._header.close()
+            self._file.close()
+        self._check()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _map_chunk(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+        start = self._header_size + self._capacity * self._dtype.itemsize
+        self._capacity += self._chunk_records
+        stop = self._header_size + self._capacity * self._dtype.itemsize
+        self._file.truncate(stop)
+        self._map_offset = start // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
+        self._map = mmap.mmap(self._file.fileno(), stop - self._map_offset, offset=self._map_offset)
+
+    def _write(self, records: npt.NDArray[Any]) -> None:
+        data = records.tobytes()
+        written = 0
+        while written < len(data):
+            if self._count == self._capacity or self._map is None:
+                self._map_chunk()
+            assert self._map is not None
+            position = self._header_size + self._count * self._dtype.itemsize - self._map_offset
+            size = min(len(data) - written, (self._capacity - self._count) * self._dtype.itemsize)
+            self._map[position : position + size] = data[written : written + size]
+            written += size
+            self._count += size // self._dtype.itemsize
+
+    def _publish(self) -> None:
+        self._header[_COUNT_OFFSET : _COUNT_OFFSET + 8] = struct.pack('<Q', self._count)
+
+    def _flush(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+        self._publish()
+        self._header.flush()
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        try:
+            while (records := self._queue.get()) is not None:
+                self._write(records)
+                if not self._queue.empty():
+                    continue
+                # readers see new records right away, syncing them to disk is rate limited
+                self._publish()
+                if time.monotonic() - last_flush >= self._flush_interval:
+                    self._flush()
+                    last_flush = time.monotonic()
+        except BaseException as exc:
+            self._error = exc
+            log.exception(f'Writing capture {self._path} failed.')
+        finally:
+            self._flush()
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+
+class CaptureReader:
+    """Zero-copy access to a capture file, also while it is still written."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self._path = Path(path)
+        with open(self._path, 'rb') as file:
+            header = file.read(_HEADER.size)
+            magic, version, header_size, _, length = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f'{self._path} is not a capture file.')
+            if version != VERSION:
+                raise ValueError(f'Unsupported capture version {version}.')
+            self._metadata: dict[str, Any] = json.loads(file.read(length))
+        self._header_size: int = header_size
+        self._dtype = record_dtype(self._metadata['fields'])
+        self._records: np.memmap[Any, np.dtype[Any]] | None = None
+        self.refresh()
+
+    @property
+    def metadata(self) -> dict[str, Any]:
+        return self._metadata
+
+    @property
+    def dtype(self) -> np.dtype[Any]:
+        return self._dtype
+
+    def _read_count(self) -> int:
+        with open(self._path, 'rb') as file:
+            file.seek(_COUNT_OFFSET)
+            return struct.unpack('<Q', file.read(8))[0]
+
+    def refresh(self) -> int:
+        """Map the records written so far and return their number."""
+        count = self._read_count()
+        if count == 0:
+            self._records = None
+        elif self._records is None or len(self._records) != count:
+            self._records = np.memmap(self._path, dtype=self._dtype, mode='r', offset=self._header_size, shape=(count,))
+        return count
+
+    @property
+    def records(self) -> npt.NDArray[Any]:
+        """Structured array of the mapped records (timestamp in ns and the value fields)."""
+        if self._records is None:
+            return np.empty(0, dtype=self._dtype)
+        return self._records
+
+    def __len__(self) -> int:
+        return 0 if self._records is None else len(self._records)
@@ -57,10 +57,74 @@ class ControlProperty[S, T](Property[S, T]):
         fdel: Callable[[S], None] | None = None,
         name: str | None = None,
         doc: str | None = None,
+        get_cmd: str | None = None,
+        set_cmd: str | None = None,
+        parse: Callable[[S, str], T] | None = None,
+        encode: Callable[[S, T], str] | None = None,
+        acknowledge: Callable[[S, str], None] | None = None,
+        snapshot: bool = True,
+        timeout: float | None = None,
+        written: Callable[[S, T], None] | None = None,
     ) -> None:
         self._type_ = type_
+        self._get_cmd = get_cmd
+        self._set_cmd = set_cmd
+        self._parse = parse
+        self._encode = encode
+        self._acknowledge = acknowledge
+        self._snapshot = snapshot
+        self._timeout = timeout
+        self._written = written
         super().__init__(fget=fget, fset=fset, fdel=fdel, name=name, doc=doc)
 
+    @property
+    def type_(self) -> type[T]:
+        return self._type_
+
+    @property
+    def get_cmd(self) -> str | None:
+        return self._get_cmd
+
+    @property
+    def set_cmd(self) -> str | None:
+        return self._set_cmd
+
+    @property
+    def snapshot(self) -> bool:
+        """Whether reading the control is free of side effects and part of a snapshot."""
+        return self._snapshot and self._get_cmd is not None
+
+    @property
+    def timeout(self) -> float | None:
+        """Timeout of the queries of the control in seconds, None for the timeout of the instrument."""
+        return self._timeout
+
+    @property
+    def expects_response(self) -> bool:
+        return self._acknowledge is not None
+
+    def parse(self, instance: S, response: str) -> T:
+        """Convert a raw response of the get command into the control value."""
+        if self._parse is None:
+            raise ValueError(f'Cannot parse a response for {self._name}.')
+        return self._parse(instance, response)
+
+    def encode(self, instance: S, value: T) -> str:
+        """Validate the value and build the (unsubstituted) set command."""
+        if self._encode is None:
+            raise ValueError(f'Cannot encode a value for {self._name}.')
+        return self._encode(instance, value)
+
+    def acknowledge(self, instance: S, response: str) -> None:
+        """Handle the response of a set command that answers."""
+        if self._acknowledge is not None:
+            self._acknowledge(instance, response)
+
+    def written(self, instance: S, value: T) -> None:
+        """Notify the control that its set command with the value was sent successfully."""
+        if self._written is not None:
+            self._written(instance, value)
+
 
 def basic_control[S: MessageProtocol, T](
     type_: type[T],
@@ -73,6 +137,9 @@ def basic_control[S: MessageProtocol, T](
     pre_format: Callable[[S, str], str] = noop,
     validate: Callable[[S, T], bool] = always,
     response: Callable[[str], None] | None = None,
+    snapshot: bool = True,
+    timeout: float | None = None,
+    written: Callable[[S, T], None] | None = None,
 ) -> Property[S, T]:
     if get_cmd is None and set_cmd is None:
         raise ValueError('No commands specified.')
@@ -84,10 +151,7 @@ def basic_control[S: MessageProtocol, T](
 
         get_format = nget_format
 
-    def _getter(self: S) -> T:
-        if get_cmd is None:
-            raise ValueError('Cannot get value without command!')
-        response = self.query(get_cmd)
+    def _parse(self: S, response: str) -> T:
         result = response
         if pre_format is not None:
             result = pre_format(self, result)
@@ -98,7 +162,7 @@ def basic_control[S: MessageProtocol, T](
                 exc.args = (exc.args[0] + f' | Format of "{response}" failed for query "{get_cmd}".', *exc.args[1:])
             raise
 
-    def _setter(self: S, value: T) -> None:
+    def _encode(self: S, value: T) -> str:
         if set_cmd is None:
             raise ValueError('Cannot set value without command!')
         if type(value) is type_:
@@ -110,14 +174,38 @@ def basic_control[S: MessageProtocol, T](
             if not validate(self, value):
                 raise ValueError('Invalid value given!')
         proc_value = value if set_format is None else set_format(value)
-        command = set_cmd % proc_value
+        return set_cmd % proc_value
+
+    def _acknowledge(self: S, result: str) -> None:
+        if response is None:
+            return
+        if pre_format is not None:
+            result = pre_format(self, result)
+        response(result)
+
+    def _query(self: S, command: str, coalesce: bool = False) -> str:
+        # other implementations of the protocol may not know the keywords, so only non-defaults are passed
+        options: dict[str, Any] = {}
+        if coalesce:
+            options['coalesce'] = True
+        if timeout is not None:
+            options['timeout'] = timeout
+        return self.query(command, **options)
+
+    def _getter(self: S) -> T:
+        if get_cmd is None:
+            raise ValueError('Cannot get value without command!')
+        # controls triggering or consuming a measurement must never share a response
+        return _parse(self, _query(self, get_cmd, coalesce=snapshot))
+
+    def _setter(self: S, value: T) -> None:
+        command = _encode(self, value)
         if response is None:
             self.send(command)
         else:
-            result = self.query(command)
-            if pre_format is not None:
-                result = pre_format(self, result)
-            response(result)
+            _acknowledge(self, _query(self, command))
+        if written is not None:
+            written(self, value)
 
     def _deleter(self: S) -> None:
         pass
@@ -128,6 +216,14 @@ def basic_control[S: MessageProtocol, T](
         fset=None if set_cmd is None else _setter,
         fdel=_deleter,
         doc=doc,
+        get_cmd=get_cmd,
+        set_cmd=set_cmd,
+        parse=None if get_cmd is None else _parse,
+        encode=None if set_cmd is None else _encode,
+        acknowledge=None if response is None else _acknowledge,
+        snapshot=snapshot,
+        timeout=timeout,
+        written=written,
     )
 
 
@@ -208,6 +304,7 @@ def enum_control[S: MessageProtocol, E: StrEnum](
     /,
     pre_format: Callable[[S, str], str] = noop,
     response: Callable[[str], None] | None = None,
+    written: Callable[[S, E], None] | None = None,
 ) -> Property[S, E]:
     return basic_control(
         enum,
@@ -219,6 +316,7 @@ def enum_control[S: MessageProtocol, E: StrEnum](
         pre_format=pre_format,
         validate=lambda _, value: value in enum,
         response=response,
+        written=written,
     )
 
 
@@ -268,6 +366,9 @@ def list_control[S: MessageProtocol, T](
     pre_format: Callable[[S, str], str] = noop,
     validate: Callable[[S, list[T]], bool] = always,
     response: Callable[[str], None] | None = None,
+    snapshot: bool = True,
+    timeout: float | None = None,
+    written: Callable[[S, list[T]], None] | None = None,
 ) -> Property[S, list[T]]:
     return basic_control(
         list[type_],
@@ -281,4 +382,7 @@ def list_control[S: MessageProtocol, T](
         pre_format=pre_format,
         validate=validate,
         response=response,
+        snapshot=snapshot,
+        timeout=timeout,
+        written=written,
     )
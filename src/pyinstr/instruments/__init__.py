@@ -13,6 +13,7 @@ from .keysight_rp79xx import KeysightRP79XX
 from .lakeshore_121 import Lakeshore121
 from .mercury_ips import MercuryiPS
 from .mercury_itc import MercuryiTC
+from .triggered_sweep import TriggeredSweep
 
 __all__ = [
     'AerotechEnsemble',
@@ -23,4 +24,5 @@ __all__ = [
     'Lakeshore121',
     'MercuryiPS',
     'MercuryiTC',
+    'TriggeredSweep',
 ]
@@ -6,18 +6,32 @@ This file is part of PyINSTR.
 """
 
 import logging
-from enum import IntFlag, StrEnum
-from typing import ClassVar
+import math
+import threading
+import time
+from collections.abc import Iterator, Mapping, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from enum import IntEnum, IntFlag, StrEnum
+from itertools import batched
+from pathlib import Path
+from types import TracebackType
+from typing import Any, ClassVar, Self
+
+import numpy as np
+import numpy.typing as npt
 
 from pyinstr import (
     Channel,
     Instrument,
     MessageProtocol,
+    Priority,
     basic_control,
     enum_control,
     flag_control,
     ignore,
     optional_control,
+    priority,
 )
 from pyinstr.adapters import VISAAdapter
 
@@ -32,6 +46,29 @@ def _check_fault(status: str) -> None:
         log.warning('Axis faults received.')
 
 
+def _strip_status(message: str) -> str:
+    _check_fault(message[0])
+    return message[1:]
+
+
+def _format_move(command: str, targets: Mapping[str, float], rate: float | Mapping[str, float] | None) -> str:
+    # each axis is followed by its optional speed, e.g. 'MOVEABS X 1 XF 10 Y 2 YF 10'
+    if not targets:
+        raise ValueError('No axes given.')
+    parts = [command]
+    for axis, target in targets.items():
+        parts.append(f'{axis} {target}')
+        axis_rate = rate.get(axis) if isinstance(rate, Mapping) else rate
+        if axis_rate is not None:
+            parts.append(f'{axis}F {axis_rate}')
+    return ' '.join(parts)
+
+
+def _remember_mode(ensemble: Any, mode: StrEnum) -> None:
+    # the wait mode can not be queried, so the monitor restores the last one written
+    ensemble._wait_mode = mode
+
+
 class AxisControl(Channel[MessageProtocol]):
     class AxisFault(IntFlag):
         PositionError = 0x1
@@ -165,13 +202,11 @@ class AxisControl(Channel[MessageProtocol]):
     )
 
     def move_abs(self, position: float, rate: float | None = None) -> None:
-        command = ('MOVEABS {ch} ' + str(position)) + ('' if rate is None else (' {ch}F ' + str(rate)))
-        status_char = self.query(command)
+        status_char = self.query(_format_move('MOVEABS', {'{ch}': position}, rate))
         _check_fault(status_char)
 
     def move_inc(self, delta: float, rate: float | None = None) -> None:
-        command = ('MOVEINC {ch} ' + str(delta)) + ('' if rate is None else (' {ch}F ' + str(rate)))
-        status_char = self.query(command)
+        status_char = self.query(_format_move('MOVEINC', {'{ch}': delta}, rate))
         _check_fault(status_char)
 
     def reset_faults(self) -> None:
@@ -186,12 +221,26 @@ class AerotechEnsemble(Instrument):
             'write_termination': '\n',
         }
     }
+    # the ASCII interface executes one command per line, but buffers several lines
+    pipeline_depth: ClassVar = 8
 
     class WaitMode(StrEnum):
         NoWait = 'NOWAIT'
         MoveDone = 'MOVEDONE'
         InPos = 'INPOS'
 
+    class TaskState(IntEnum):
+        Unavailable = 0
+        Inactive = 1
+        Idle = 2
+        ProgramReady = 3
+        ProgramRunning = 4
+        ProgramFeedheld = 5
+        ProgramPaused = 6
+        ProgramComplete = 7
+        Error = 8
+        Queue = 9
+
     def _pre_format(self, message: str) -> str:
         status_char = message[0]
         _check_fault(status_char)
@@ -212,6 +261,549 @@ class AerotechEnsemble(Instrument):
         'WAIT MODE %s',
         pre_format=_pre_format,
         response=ignore,
+        written=_remember_mode,
     )
 
     axes = AxisControl.make_dynamic()
+
+    def move_abs(self, positions: Mapping[str, float], rate: float | Mapping[str, float] | None = None) -> None:
+        """Move several axes to absolute positions together, at one rate or a rate per axis."""
+        _check_fault(self.query(_format_move('MOVEABS', positions, rate)))
+
+    def move_inc(self, distances: Mapping[str, float], rate: float | Mapping[str, float] | None = None) -> None:
+        """Move several axes by distances with a single command, see :meth:`move_abs`."""
+        _check_fault(self.query(_format_move('MOVEINC', distances, rate)))
+
+    def run_program(self, task: int, name: str) -> None:
+        """Load and run the program file ``name`` stored on the controller on a task."""
+        _check_fault(self.query(f'PROGRAM RUN {task}, "{name}"'))
+
+    def stop_program(self, task: int) -> None:
+        _check_fault(self.query(f'PROGRAM STOP {task}'))
+
+    def task_state(self, task: int) -> TaskState:
+        return AerotechEnsemble.TaskState(int(float(_strip_status(self.query(f'TASKSTATE({task})')))))
+
+    def task_error(self, task: int) -> int:
+        """Error code of a task, 0 if the task has no error."""
+        return int(float(_strip_status(self.query(f'TASKERROR({task})'))))
+
+    def wait_program(self, task: int, interval: float = 0.5, timeout: float | None = None) -> TaskState:
+        """Wait until the program of a task is no longer running and return the final state."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        running = (AerotechEnsemble.TaskState.ProgramRunning, AerotechEnsemble.TaskState.ProgramFeedheld)
+        while True:
+            with priority(Priority.Polling):
+                state = AerotechEnsemble.task_state(self, task)
+            if state == AerotechEnsemble.TaskState.Error:
+                with priority(Priority.Polling):
+                    error = AerotechEnsemble.task_error(self, task)
+                raise RuntimeError(f'The program of task {task} failed with error {error}.')
+            if state not in running:
+                return state
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0.0:
+                raise TimeoutError(f'The program of task {task} did not complete within {timeout} s.')
+            time.sleep(interval if remaining is None else min(interval, remaining))
+
+    def read_axes(self, names: Sequence[str], query: str) -> dict[str, str]:
+        """Query a function of several axes, e.g. ``'PFBK'``, in one pipelined transaction."""
+        responses = self.query_many([f'{query}({name})' for name in names])
+        return {name: _strip_status(response) for name, response in zip(names, responses, strict=True)}
+
+    def positions(self, names: Sequence[str]) -> dict[str, float]:
+        """Positions of several axes read in one transaction."""
+        return {name: float(value) for name, value in self.read_axes(names, 'PFBK').items()}
+
+    def statuses(self, names: Sequence[str]) -> dict[str, AxisControl.AxisStatus]:
+        """Status of several axes read in one transaction."""
+        return {name: AxisControl.AxisStatus(int(value)) for name, value in self.read_axes(names, 'AXISSTATUS').items()}
+
+
+@dataclass(eq=False)
+class _Motion:
+    future: Future[dict[str, float]]
+    targets: dict[str, float]
+    rates: dict[str, float | None]
+    positions: dict[str, float] = field(default_factory=dict)
+    velocities: dict[str, float] = field(default_factory=dict)
+    timestamp: float | None = None
+
+
+class MotionMonitor:
+    """Runs moves of an Ensemble without blocking, completing a future per move with the final positions."""
+
+    def __init__(self, ensemble: AerotechEnsemble, min_interval: float = 0.005, max_interval: float = 0.5) -> None:
+        self._ensemble = ensemble
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._motions: list[_Motion] = []
+        self._io = threading.RLock()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._running = False
+        self._due = 0.0
+        self._mode: AerotechEnsemble.WaitMode | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def moving(self) -> list[str]:
+        """Axes with a move in flight."""
+        with self._lock:
+            return [axis for motion in self._motions for axis in motion.targets]
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+        with self._io:
+            self._mode = getattr(self._ensemble, '_wait_mode', AerotechEnsemble.WaitMode.MoveDone)
+            self._ensemble.mode = AerotechEnsemble.WaitMode.NoWait
+        self._thread = threading.Thread(target=self._run, name='pyinstr-motion', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop monitoring and restore the wait mode, pending futures are cancelled while their moves continue."""
+        with self._lock:
+            self._running = False
+            # the cancelled moves are no longer monitored, so they are not aborted
+            motions, self._motions = self._motions, []
+            self._wake.notify_all()
+            thread, self._thread = self._thread, None
+        for motion in motions:
+            motion.future.cancel()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        mode, self._mode = self._mode, None
+        if mode is not None:
+            with self._io:
+                self._ensemble.mode = mode
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def move_abs(
+        self, positions: Mapping[str, float], rate: float | Mapping[str, float] | None = None
+    ) -> Future[dict[str, float]]:
+        """Start moving axes to absolute positions, see :meth:`AerotechEnsemble.move_abs`."""
+        return self._move('MOVEABS', dict(positions), dict(positions), rate)
+
+    def move_inc(
+        self, distances: Mapping[str, float], rate: float | Mapping[str, float] | None = None
+    ) -> Future[dict[str, float]]:
+        """Start moving axes by distances, see :meth:`AerotechEnsemble.move_inc`."""
+        with self._io:
+            # the commanded position of an axis at rest is its exact start
+            start = self._ensemble.read_axes(list(distances), 'PCMD')
+        targets = {axis: float(start[axis]) + distance for axis, distance in distances.items()}
+        return self._move('MOVEINC', dict(distances), targets, rate)
+
+    def abort(self, names: Sequence[str] | None = None) -> None:
+        """Abort the moves of the axes, by default of all moving axes."""
+        names = self.moving if names is None else names
+        with self._io:
+            for name in names:
+                _check_fault(self._ensemble.query(f'ABORT {name}'))
+        # aborted axes never reach their targets
+        with self._lock:
+            motions = [motion for motion in self._motions if not motion.targets.keys().isdisjoint(names)]
+        self._finish(motions, RuntimeError(f'The moves of {list(names)} were aborted.'))
+
+    def _move(
+        self,
+        command: str,
+        arguments: dict[str, float],
+        targets: dict[str, float],
+        rate: float | Mapping[str, float] | None,
+    ) -> Future[dict[str, float]]:
+        if not self._running:
+            raise RuntimeError('The motion monitor is not running.')
+        busy = set(self.moving) & set(targets)
+        if busy:
+            raise ValueError(f'The axes {sorted(busy)} are already moving.')
+        rates = {axis: rate.get(axis) if isinstance(rate, Mapping) else rate for axis in targets}
+        future: Future[dict[str, float]] = Future()
+        with self._io:
+            _check_fault(self._ensemble.query(_format_move(command, arguments, rate)))
+        with self._lock:
+            self._motions.append(_Motion(future, targets, rates))
+            self._due = min(self._due, time.monotonic())
+            self._wake.notify_all()
+        future.add_done_callback(self._cancelled)
+        return future
+
+    def _cancelled(self, future: Future[dict[str, float]]) -> None:
+        if not future.cancelled():
+            return
+        with self._lock:
+            motions = [motion for motion in self._motions if motion.future is future]
+            self._motions = [motion for motion in self._motions if motion.future is not future]
+        for motion in motions:
+            try:
+                self.abort(list(motion.targets))
+            except Exception:
+                log.exception(f'Aborting the move of {list(motion.targets)} failed.')
+
+    def _interval(self, motions: Sequence[_Motion]) -> float:
+        interval = self._max_interval
+        for motion in motions:
+            for axis, target in motion.targets.items():
+                speed = motion.rates[axis] or motion.velocities.get(axis)
+                position = motion.positions.get(axis)
+                if not speed or position is None:
+                    interval = self._min_interval
+                    continue
+                interval = min(interval, 0.5 * abs(target - position) / abs(speed))
+        return max(interval, self._min_interval)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while self._running and (not self._motions or self._due > time.monotonic()):
+                    self._wake.wait(None if not self._motions else self._due - time.monotonic())
+                if not self._running:
+                    return
+                motions = list(self._motions)
+            try:
+                self._poll(motions)
+            except Exception as exc:
+                log.exception('Polling the moving axes failed.')
+                self._finish(motions, exc)
+            with self._lock:
+                self._due = time.monotonic() + self._interval(self._motions)
+
+    def _poll(self, motions: Sequence[_Motion]) -> None:
+        axes = [axis for motion in motions for axis in motion.targets]
+        with self._io, priority(Priority.Polling):
+            timestamp = time.monotonic()
+            responses = self._ensemble.query_many(
+                [f'{query}({axis})' for axis in axes for query in ('AXISSTATUS', 'AXISFAULT', 'PCMD', 'PFBK')]
+            )
+        values = dict(zip(axes, batched(responses, 4), strict=True))
+        done: list[_Motion] = []
+        for motion in motions:
+            active = False
+            faults: dict[str, AxisControl.AxisFault] = {}
+            for axis, target in motion.targets.items():
+                status, fault, command, position = (_strip_status(value) for value in values[axis])
+                if AxisControl.AxisFault(int(fault)):
+                    faults[axis] = AxisControl.AxisFault(int(fault))
+                flags = AxisControl.AxisStatus(int(status))
+                # right after the move command, MoveActive may not be set yet while the axis is still in position
+                if (
+                    flags & AxisControl.AxisStatus.MoveActive
+                    or not flags & AxisControl.AxisStatus.InPosition
+                    or not math.isclose(float(command), target, rel_tol=1e-9, abs_tol=1e-6)
+                ):
+                    active = True
+                previous = motion.positions.get(axis)
+                motion.positions[axis] = float(position)
+                if previous is not None and motion.timestamp is not None and timestamp > motion.timestamp:
+                    motion.velocities[axis] = (float(position) - previous) / (timestamp - motion.timestamp)
+            motion.timestamp = timestamp
+            if faults:
+                self._finish([motion], RuntimeError(f'Axes faulted during the move: {faults}'))
+            elif not active:
+                done.append(motion)
+        for motion in done:
+            self._finish([motion], None)
+
+    def _finish(self, motions: Sequence[_Motion], exc: BaseException | None) -> None:
+        with self._lock:
+            self._motions = [motion for motion in self._motions if motion not in motions]
+        for motion in motions:
+            if motion.future.done():
+                continue
+            if exc is None:
+                motion.future.set_result(dict(motion.positions))
+            else:
+                motion.future.set_exception(exc)
+
+
+class DataCollection:
+    """Samples axis signals on the controller every ``period`` ms and fetches them into NumPy."""
+
+    class Item(StrEnum):
+        PositionCommand = 'DATAITEM_PositionCommand'
+        PositionFeedback = 'DATAITEM_PositionFeedback'
+        PositionError = 'DATAITEM_PositionError'
+        VelocityCommand = 'DATAITEM_VelocityCommand'
+        VelocityFeedback = 'DATAITEM_VelocityFeedback'
+        CurrentCommand = 'DATAITEM_CurrentCommand'
+        CurrentFeedback = 'DATAITEM_CurrentFeedback'
+        AxisStatus = 'DATAITEM_AxisStatus'
+        AxisFault = 'DATAITEM_AxisFault'
+
+    def __init__(
+        self,
+        ensemble: AerotechEnsemble,
+        items: Sequence[tuple[str, Item]],
+        points: int,
+        period: int = 1,
+        base: int = 0,
+    ) -> None:
+        if not items:
+            raise ValueError('No items given.')
+        if points < 1 or period < 1:
+            raise ValueError('The number of points and the period must be positive.')
+        self._ensemble = ensemble
+        self._items = list(items)
+        self._points = points
+        self._period = period
+        self._base = base
+        self._fetched = 0
+
+    @property
+    def points(self) -> int:
+        return self._points
+
+    @property
+    def period(self) -> float:
+        """Time between samples in seconds."""
+        return self._period / 1000.0
+
+    def dtype(self) -> np.dtype[Any]:
+        """Record layout of the samples: the ``time`` and a field per item named ``'<axis>.<item>'``."""
+        return np.dtype([('time', np.float64), *((f'{axis}.{item.name}', np.float64) for axis, item in self._items)])
+
+    def start(self) -> None:
+        """Configure the items and start collecting."""
+        commands = ['DATACOLLECT ITEM RESET']
+        commands += [f'DATACOLLECT ITEM ADD {item}, {axis}, 0' for axis, item in self._items]
+        commands.append(f'DATACOLLECT START DGLOBAL({self._base}), {self._points}, {self._period}')
+        for command in commands:
+            _check_fault(self._ensemble.query(command))
+        self._fetched = 0
+
+    def stop(self) -> None:
+        _check_fault(self._ensemble.query('DATACOLLECT STOP'))
+
+    def collected(self) -> int:
+        """Number of samples collected so far."""
+        return int(float(_strip_status(self._ensemble.query('DATACOLLECT STATUS(DATACOLLECT_STATUS_PointsCollected)'))))
+
+    def read(self, start: int, stop: int) -> npt.NDArray[Any]:
+        """Read the collected samples ``start`` to ``stop`` (exclusive)."""
+        width = len(self._items)
+        first = self._base + start * width
+        responses = self._ensemble.query_many(
+            [f'DGLOBAL({index})' for index in range(first, first + (stop - start) * width)]
+        )
+        values = np.array([_strip_status(response) for response in responses], dtype=np.float64).reshape(-1, width)
+        samples = np.empty(stop - start, dtype=self.dtype())
+        samples['time'] = np.arange(start, stop) * self.period
+        for index, (axis, item) in enumerate(self._items):
+            samples[f'{axis}.{item.name}'] = values[:, index]
+        return samples
+
+    def _wait(self, count: int, deadline: float | None) -> int:
+        # samples arrive at a known rate, so wait for the expected time before asking again
+        while (collected := self.collected()) < count:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0.0:
+                raise TimeoutError(f'Only {collected} of {count} samples were collected.')
+            delay = max((count - collected) * self.period, 0.01)
+            time.sleep(delay if remaining is None else min(delay, remaining))
+        return collected
+
+    def fetch(self, timeout: float | None = None) -> npt.NDArray[Any]:
+        """Wait until all samples were collected and read them."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._wait(self._points, deadline)
+        return self.read(0, self._points)
+
+    def stream(self, chunk: int = 256, timeout: float | None = None) -> Iterator[npt.NDArray[Any]]:
+        """Yield the samples in chunks of up to ``chunk`` samples as soon as they were collected."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._fetched < self._points:
+            count = min(self._fetched + chunk, self._points)
+            collected = min(self._wait(count, deadline), self._points)
+            samples = self.read(self._fetched, collected)
+            self._fetched = collected
+            yield samples
+
+
+# operations and wait modes encoded in the move table of AeroBasicProgram
+_TABLE_OPS = {'MOVEABS': 1, 'MOVEINC': 2, 'LINEARABS': 3, 'LINEARINC': 4, 'DWELL': 5}
+_TABLE_WAIT = {'NOWAIT': 0, 'MOVEDONE': 1, 'INPOS': 2}
+_TABLE_HEADER = 3
+
+
+@dataclass(frozen=True)
+class _Step:
+    op: str
+    lines: tuple[str, ...]
+    targets: dict[str, float] = field(default_factory=dict)
+    rates: dict[str, float | None] = field(default_factory=dict)
+    value: float | None = None
+
+
+class AeroBasicProgram:
+    """Program of moves run by the controller, saved as source or uploaded as table for the :meth:`interpreter`."""
+
+    def __init__(
+        self,
+        count: int = 1,
+        wait_mode: AerotechEnsemble.WaitMode = AerotechEnsemble.WaitMode.MoveDone,
+    ) -> None:
+        if count < 1:
+            raise ValueError('The program runs at least once.')
+        self.count = count
+        self.wait_mode = wait_mode
+        self._steps: list[_Step] = []
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def move_abs(self, positions: Mapping[str, float], rate: float | Mapping[str, float] | None = None) -> None:
+        self._move('MOVEABS', positions, rate)
+
+    def move_inc(self, distances: Mapping[str, float], rate: float | Mapping[str, float] | None = None) -> None:
+        self._move('MOVEINC', distances, rate)
+
+    def _move(self, command: str, targets: Mapping[str, float], rate: float | Mapping[str, float] | None) -> None:
+        rates = {axis: rate.get(axis) if isinstance(rate, Mapping) else rate for axis in targets}
+        self._steps.append(_Step(command, (_format_move(command, targets, rate),), dict(targets), rates))
+
+    def linear(self, targets: Mapping[str, float], speed: float | None = None, incremental: bool = False) -> None:
+        """Coordinated linear move of several axes at the vector speed ``speed``."""
+        mode = 'INC' if incremental else 'ABS'
+        command = _format_move('LINEAR', targets, None) + ('' if speed is None else f' F {speed}')
+        self._steps.append(_Step(f'LINEAR{mode}', (mode, command), dict(targets), value=speed))
+
+    def dwell(self, seconds: float) -> None:
+        self._steps.append(_Step('DWELL', (f'DWELL {seconds}',), value=seconds))
+
+    def command(self, line: str) -> None:
+        """Append any AeroBasic statement, e.g. setting a digital output (standalone source only)."""
+        self._steps.append(_Step('COMMAND', (line,)))
+
+    def source(self) -> str:
+        program = [line for step in self._steps for line in step.lines]
+        if self.count == 1:
+            lines = [f'WAIT MODE {self.wait_mode}', *program]
+        else:
+            lines = ['DVAR $repeat', '', f'WAIT MODE {self.wait_mode}', f'FOR $repeat = 1 TO {self.count}']
+            lines += [f'    {line}' for line in program]
+            lines.append('NEXT $repeat')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.write_text(self.source())
+        return path
+
+    def table(self, axes: Sequence[str]) -> npt.NDArray[np.float64]:
+        """Move table of the program, a row per step with the operation, its value and per axis flag, target, rate."""
+        table = np.zeros((len(self._steps), 2 + 3 * len(axes)), dtype=np.float64)
+        for row, step in zip(table, self._steps, strict=True):
+            if step.op not in _TABLE_OPS:
+                raise ValueError(f'The statement "{step.lines[0]}" can not be part of a move table.')
+            unknown = set(step.targets) - set(axes)
+            if unknown:
+                raise ValueError(f'The axes {sorted(unknown)} are not part of the table.')
+            row[0] = _TABLE_OPS[step.op]
+            row[1] = step.value or 0.0
+            for index, axis in enumerate(axes):
+                if axis in step.targets:
+                    row[2 + 3 * index : 5 + 3 * index] = (1.0, step.targets[axis], step.rates.get(axis) or 0.0)
+        return table
+
+    def upload(self, ensemble: AerotechEnsemble, axes: Sequence[str], base: int = 0) -> None:
+        """Write the move table into the global doubles read by the :meth:`interpreter` of the axes."""
+        header = [len(self._steps), self.count, _TABLE_WAIT[self.wait_mode]]
+        values = [*header, *self.table(axes).ravel().tolist()]
+        responses = ensemble.query_many([f'DGLOBAL({base + index}) = {value!r}' for index, value in enumerate(values)])
+        for response in responses:
+            _check_fault(response)
+
+    @staticmethod
+    def interpreter(axes: Sequence[str], base: int = 0) -> str:
+        """Source of the program executing the move tables of :meth:`upload` for the axes."""
+        if not axes:
+            raise ValueError('No axes given.')
+        width = 2 + 3 * len(axes)
+        names = ' '.join(axes)
+        points = [f'$p{index}' for index in range(len(axes))]
+        linear = 'LINEAR ' + ' '.join(f'{axis} {point}' for axis, point in zip(axes, points, strict=True))
+        lines = [f'DVAR {name}' for name in ('$repeat', '$rows', '$row', '$index', '$op', '$value', '$wait')]
+        lines += [f'DVAR {name}' for index in range(len(axes)) for name in (f'$p{index}', f'$f{index}')]
+        lines += [
+            '',
+            'WAIT MODE NOWAIT',
+            f'$rows = DGLOBAL({base}) - 1',
+            f'$wait = DGLOBAL({base + 2})',
+            f'FOR $repeat = 1 TO DGLOBAL({base + 1})',
+            '    FOR $row = 0 TO $rows',
+            f'        $index = {base + _TABLE_HEADER} + $row * {width}',
+            '        $op = DGLOBAL($index)',
+            '        $value = DGLOBAL($index + 1)',
+            f'        IF $op = {_TABLE_OPS["MOVEABS"]} OR $op = {_TABLE_OPS["MOVEINC"]} THEN',
+        ]
+        for index, axis in enumerate(axes):
+            offset = 2 + 3 * index
+            lines += [
+                f'            IF DGLOBAL($index + {offset}) <> 0 THEN',
+                f'                $p{index} = DGLOBAL($index + {offset + 1})',
+                f'                $f{index} = DGLOBAL($index + {offset + 2})',
+            ]
+            for op, command in (('MOVEABS', 'IF'), ('MOVEINC', 'ELSEIF')):
+                lines += [
+                    f'                {command} $op = {_TABLE_OPS[op]} THEN',
+                    f'                    IF $f{index} > 0 THEN',
+                    f'                        {op} {axis} $p{index} {axis}F $f{index}',
+                    '                    ELSE',
+                    f'                        {op} {axis} $p{index}',
+                    '                    END IF',
+                ]
+            lines += ['                END IF', '            END IF']
+        lines.append(f'        ELSEIF $op = {_TABLE_OPS["LINEARABS"]} OR $op = {_TABLE_OPS["LINEARINC"]} THEN')
+        for index, axis in enumerate(axes):
+            # axes without a target keep their position
+            offset = 2 + 3 * index
+            lines += [
+                f'            IF DGLOBAL($index + {offset}) <> 0 THEN',
+                f'                $p{index} = DGLOBAL($index + {offset + 1})',
+                f'            ELSEIF $op = {_TABLE_OPS["LINEARABS"]} THEN',
+                f'                $p{index} = PCMD({axis})',
+                '            ELSE',
+                f'                $p{index} = 0',
+                '            END IF',
+            ]
+        lines += [
+            f'            IF $op = {_TABLE_OPS["LINEARABS"]} THEN',
+            '                ABS',
+            '            ELSE',
+            '                INC',
+            '            END IF',
+            '            IF $value > 0 THEN',
+            f'                {linear} F $value',
+            '            ELSE',
+            f'                {linear}',
+            '            END IF',
+            f'        ELSEIF $op = {_TABLE_OPS["DWELL"]} THEN',
+            '            DWELL $value',
+            '        END IF',
+            f'        IF $wait = {_TABLE_WAIT["MOVEDONE"]} THEN',
+            f'            WAIT MOVEDONE {names}',
+            f'        ELSEIF $wait = {_TABLE_WAIT["INPOS"]} THEN',
+            f'            WAIT INPOS {names}',
+            '        END IF',
+            '    NEXT $row',
+            'NEXT $repeat',
+        ]
+        return '\n'.join(lines) + '\n'
@@ -7,6 +7,7 @@ This file is part of PyINSTR.
 
 from collections.abc import Callable
 from enum import StrEnum
+from typing import ClassVar
 
 from pyinstr import BoolFormat, Channel, MessageProtocol, basic_control, bool_control, enum_control, ignore
 from pyinstr.validator import in_range, in_range_inc
@@ -42,6 +43,8 @@ class TemperatureSensor(Channel[MessageProtocol]):
 
 
 class TemperatureLoopControl(TemperatureSensor):
+    configure_order: ClassVar = ('pid_enabled', 'ramp_enabled', '*', 'temperature_setpoint')
+
     pid_enabled = bool_control(
         BoolFormat.OnOff,
         """Control whether the control-loop heater is controlled by
@@ -231,6 +234,8 @@ class MagnetControl(Channel[MessageProtocol]):
         ClampOutput = 'CLMP'
         Unknown = 'N/A'
 
+    configure_order: ClassVar = ('*', 'field_rate_setpoint', 'field_setpoint', 'action')
+
     field = basic_control(
         float,
         """Get the most recent field reading, in Tesla.""",
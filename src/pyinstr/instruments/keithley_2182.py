@@ -5,8 +5,16 @@ This file is part of PyINSTR.
 :license: MIT, see LICENSE for more details.
 """
 
+from collections.abc import Sequence
+from enum import StrEnum
+from typing import Any, ClassVar
+
+import numpy as np
+import numpy.typing as npt
+
 from pyinstr import BoolFormat, Channel, Instrument, MessageProtocol, basic_control, bool_control
 from pyinstr.instruments.mixins import KeithleyBufferMixin, KeithleyMixin, SCPIMixin
+from pyinstr.instruments.mixins.keithley import reading_dtype
 from pyinstr.validator import for_channel, in_range_inc, in_set
 
 
@@ -76,6 +84,8 @@ class Keithley2182Channel(Channel[MessageProtocol]):
 
 
 class Keithley2182(KeithleyMixin, KeithleyBufferMixin, SCPIMixin, Instrument):
+    configure_order: ClassVar = ('active_channel', 'function', '*', 'initiate_continuous_enabled')
+
     active_channel = basic_control(
         int,
         """Control which channel is active for measurement.""",
@@ -95,3 +105,63 @@ class Keithley2182(KeithleyMixin, KeithleyBufferMixin, SCPIMixin, Instrument):
         set_format=lambda value: value.value,
         validate=in_set(KeithleyMixin.ChannelFunction.Voltage, KeithleyMixin.ChannelFunction.Temperature),
     )
+
+    class Combination(StrEnum):
+        Ratio = 'RAT'
+        Delta = 'DELT'
+
+    def acquire(
+        self: Instrument,
+        count: int,
+        channels: Sequence[int] = (1, 2),
+        combination: Combination | None = None,
+        elements: Sequence[KeithleyMixin.FormatElement] = (
+            KeithleyMixin.FormatElement.Reading,
+            KeithleyMixin.FormatElement.Timestamp,
+            KeithleyMixin.FormatElement.ReadingNumber,
+        ),
+        timeout: float | None = None,
+    ) -> npt.NDArray[Any]:
+        """Acquire ``count`` buffered voltage readings of each channel at the internal rate.
+
+        The instrument measures one channel at a time, so each channel is acquired as one block
+        into the buffer and transferred at once. The readings of all channels are returned as one
+        structured array with the field ``channel`` and one field per format element. With a
+        combination the ratio or delta of both channels is acquired instead, marked as channel 0.
+        """
+        if not 2 <= count <= 1024:
+            raise ValueError('The buffer holds 2 to 1024 readings.')
+        if KeithleyMixin.FormatElement.Channel in elements:
+            raise ValueError('The channel is added to the readings, it is no format element.')
+        blocks: list[npt.NDArray[Any]] = []
+        dtype = np.dtype([('channel', '<i8'), *reading_dtype(elements).descr])
+        for channel in (1,) if combination is not None else channels:
+            if channel not in (1, 2):
+                raise ValueError(f'Invalid channel {channel}.')
+            self.send_many(
+                [
+                    ':ABOR',
+                    ':INIT:CONT OFF',
+                    f':SENS:CHAN {channel}',
+                    f':SENS:VOLT:RAT {"ON" if combination is Keithley2182.Combination.Ratio else "OFF"}',
+                    f':SENS:VOLT:DELT {"ON" if combination is Keithley2182.Combination.Delta else "OFF"}',
+                    ':TRIG:SOUR IMM',
+                    ':TRIG:COUN 1',
+                    f':SAMP:COUN {count}',
+                    ':TRAC:CLE',
+                    f':TRAC:POIN {count}',
+                    ':TRAC:FEED SENS',
+                    ':TRAC:FEED:CONT NEXT',
+                    KeithleyMixin.format_elements.encode(self, list(elements)),
+                    ':INIT',
+                ]
+            )
+            KeithleyMixin.format_elements.written(self, list(elements))
+            SCPIMixin.wait_complete(self, timeout)
+            readings = KeithleyBufferMixin.buffer_records(self, elements)
+            block = np.empty(len(readings), dtype=dtype)
+            block['channel'] = 0 if combination is not None else channel
+            for name in readings.dtype.names or ():
+                block[name] = readings[name]
+            blocks.append(block)
+        return np.concatenate(blocks)
@@ -1,8 +1,48 @@
-from pyinstr import BoolFormat, Channel, Instrument, MessageProtocol, basic_control, bool_control
+from collections.abc import Sequence
+from enum import StrEnum
+
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr import (
+    BoolFormat,
+    Channel,
+    Instrument,
+    MessageProtocol,
+    basic_control,
+    bool_control,
+    enum_control,
+    list_control,
+)
 from pyinstr.instruments.mixins import KeithleyBufferMixin, KeithleyMixin, SCPIMixin
 from pyinstr.validator import for_channel, in_range_inc
 
 
+def parse_channel_list(value: str) -> list[int]:
+    """Channels of a channel list like ``(@101:103,105)``."""
+    channels: list[int] = []
+    for entry in value.strip(' ()@').split(','):
+        if not entry:
+            continue
+        first, _, last = entry.partition(':')
+        channels.extend(range(int(first), int(last or first) + 1))
+    return channels
+
+
+def format_channel_list(channels: Sequence[int]) -> str:
+    """Channel list with consecutive channels combined into ranges, e.g. ``101:103,105``."""
+    entries: list[str] = []
+    start = previous = None
+    for channel in [*channels, None]:
+        if previous is not None and channel == previous + 1:
+            previous = channel
+            continue
+        if start is not None:
+            entries.append(str(start) if start == previous else f'{start}:{previous}')
+        start = previous = channel
+    return ','.join(entries)
+
+
 class Keithley2700Channel(Channel[MessageProtocol]):
     voltage_range_auto_enabled = bool_control(
         BoolFormat.OneZero,
@@ -40,3 +80,79 @@ class Keithley2700(KeithleyMixin, KeithleyBufferMixin, SCPIMixin, Instrument):
         ':ROUT:CLOS (@%d)',
         get_format=lambda v: -1 if v == '' else int(v.strip(' ()@,')),
     )
+
+    class ScanList(StrEnum):
+        Internal = 'INT'
+        Nothing = 'NONE'
+
+    scan_channels = list_control(
+        int,
+        """Get/set the channels of the internal scan list.""",
+        ':ROUT:SCAN?',
+        ':ROUT:SCAN (@%s)',
+        get_format=parse_channel_list,
+        set_format=format_channel_list,
+    )
+
+    scan_list = enum_control(
+        ScanList,
+        """Select the scan list which is used by a measurement.""",
+        ':ROUT:SCAN:LSEL?',
+        ':ROUT:SCAN:LSEL %s',
+    )
+
+    def configure_scan(
+        self: Instrument, channels: Sequence[int], scans: int = 1, interval: float | None = None
+    ) -> None:
+        """Program the scan of the channels into the instrument and store the readings in the buffer.
+
+        Each trigger scans the channels once, triggers follow immediately or every ``interval``
+        seconds. Only the readings are stored, so the buffer holds ``scans * len(channels)`` values.
+        """
+        count = len(channels) * scans
+        if len(set(channels)) != len(channels):
+            raise ValueError('The scan list contains duplicate channels.')
+        if not 1 <= count <= 55000:
+            raise ValueError(f'The buffer can not hold {count} readings.')
+        trigger = [':TRIG:SOUR IMM'] if interval is None else [':TRIG:SOUR TIM', f':TRIG:TIM {interval:g}']
+        self.send_many(
+            [
+                ':ABOR',
+                ':INIT:CONT OFF',
+                ':TRAC:CLE',
+                f':ROUT:SCAN (@{format_channel_list(channels)})',
+                ':ROUT:SCAN:TSO IMM',
+                ':ROUT:SCAN:LSEL INT',
+                *trigger,
+                f':TRIG:COUN {scans}',
+                f':SAMP:COUN {len(channels)}',
+                f':TRAC:POIN {max(count, 2)}',
+                ':TRAC:FEED SENS',
+                ':TRAC:FEED:CONT NEXT',
+                KeithleyMixin.format_elements.encode(self, [KeithleyMixin.FormatElement.Reading]),
+            ]
+        )
+        KeithleyMixin.format_elements.written(self, [KeithleyMixin.FormatElement.Reading])
+
+    def scan(
+        self: Instrument,
+        channels: Sequence[int],
+        scans: int = 1,
+        interval: float | None = None,
+        timeout: float | None = None,
+    ) -> dict[int, npt.NDArray[np.float64]]:
+        """Scan the channels on the instrument and return the readings of each channel.
+
+        The complete scan runs on the instrument at its native rate, the buffer is transferred at
+        once afterwards. Relays are opened and the scan list deselected when done.
+        """
+        Keithley2700.configure_scan(self, channels, scans, interval)
+        self.send(':INIT')
+        try:
+            SCPIMixin.wait_complete(self, timeout)
+            data = KeithleyBufferMixin.buffer_array(self)
+        finally:
+            self.send_many([':ROUT:SCAN:LSEL NONE', ':ROUT:OPEN:ALL'])
+        # readings are stored scan after scan, one row per scan
+        columns = data[: scans * len(channels)].reshape(scans, len(channels)).T.copy()
+        return dict(zip(channels, columns, strict=True))
@@ -27,6 +27,7 @@ class Lakeshore121(Instrument):
             'write_termination': '\n',
         }
     }
+    configure_order: ClassVar = ('*', 'enabled')
 
     identity = basic_control(
         str,
@@ -6,15 +6,17 @@ This file is part of PyINSTR.
 """
 
 from .keithley import KeithleyBufferMixin, KeithleyMixin
-from .keysight import KeysightListMixin, KeysightSupplyMixin
+from .keysight import ArbWaveform, KeysightListMixin, KeysightSupplyMixin, ListSequence
 from .mercury import MercuryMixin
 from .scpi import SCPIMixin
 
 __all__ = [
+    'ArbWaveform',
     'KeithleyBufferMixin',
     'KeithleyMixin',
     'KeysightListMixin',
     'KeysightSupplyMixin',
+    'ListSequence',
     'MercuryMixin',
     'SCPIMixin',
 ]
@@ -5,13 +5,104 @@ This file is part of PyINSTR.
 :license: MIT, see LICENSE for more details.
 """
 
+import re
+from collections.abc import Iterable, Sequence
 from enum import StrEnum
-from typing import ClassVar
+from typing import Any, ClassVar
 
-from pyinstr import BoolFormat, MessageProtocol, basic_control, bool_control, enum_control, list_control
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr import BoolFormat, Instrument, MessageProtocol, basic_control, bool_control, enum_control, list_control
 from pyinstr.adapters import VISAAdapter
+from pyinstr.instruments.mixins.scpi import SCPIMixin
 from pyinstr.validator import in_range_inc
 
+# fields of the format elements, in the order the instrument sends them (units are appended to the values)
+_ELEMENT_FIELDS: dict[str, tuple[str, str]] = {
+    'READ': ('reading', '<f8'),
+    'TST': ('timestamp', '<f8'),
+    'RNUM': ('reading_number', '<i8'),
+    'CHAN': ('channel', '<i8'),
+    'LIM': ('limits', '<i8'),
+}
+
+
+# leading number of each element, e.g. '+12.345' of '+12.345SECS'
+_VALUE = re.compile(r'(?:^|,)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)')
+
+
+def parse_values(response: str) -> npt.NDArray[np.float64]:
+    """Values of all elements of a reply, dropping units and suffixes like ``RDNG#``."""
+    return np.array(_VALUE.findall(response), dtype=np.float64)
+
+
+def parse_reading(response: str) -> float:
+    """Value of the first element of a reply, usually the reading."""
+    match = _VALUE.match(response)
+    if match is None:
+        raise ValueError(f'"{response}" does not start with a reading.')
+    return float(match.group(1))
+
+
+def parse_readings(response: str, elements: Iterable[str]) -> npt.NDArray[Any]:
+    """Parse a reply of readings with several format elements into a structured array.
+
+    .. code-block:: python
+
+        parse_readings('+1.23E-3VDC,+12.345SECS,+42RDNG#', ['READ', 'UNIT', 'TST', 'RNUM'])
+    """
+    return readings_from_values(parse_values(response), reading_dtype(elements))
+
+
+def _remember_elements(instrument: Any, elements: Iterable[str] | None) -> None:
+    # successful writes of the format controls keep the elements up to date, so readings are parsed without asking
+    instrument._format_elements = None if elements is None else [str(element).strip() for element in elements]
+
+
+def _read_elements(instrument: Any, response: str) -> str:
+    _remember_elements(instrument, response.split(','))
+    return response
+
+
+def _format_elements(instrument: MessageProtocol) -> list[str]:
+    elements = getattr(instrument, '_format_elements', None)
+    if elements is None:
+        elements = instrument.query(':FORM:ELEM?').split(',')
+        _remember_elements(instrument, elements)
+    return elements
+
+
+def _reading(self: MessageProtocol, response: str) -> str:
+    # the reading is not necessarily the first value, e.g. if the elements lack READ
+    elements = _format_elements(self)
+    records = parse_readings(response, elements)
+    if 'reading' not in (records.dtype.names or ()):
+        raise ValueError(f'The format elements {elements} contain no reading.')
+    if len(records) != 1:
+        raise ValueError(f'The reply holds {len(records)} readings, use the records to get all of them.')
+    return str(records['reading'][0])
+
+
+def reading_dtype(elements: Iterable[str]) -> np.dtype[Any]:
+    """Record layout of readings with the given format elements."""
+    selected = set(elements)
+    return np.dtype([field for element, field in _ELEMENT_FIELDS.items() if element in selected])
+
+
+def readings_from_values(values: npt.NDArray[np.float64], dtype: np.dtype[Any]) -> npt.NDArray[Any]:
+    """Group the values of all elements of all readings into records."""
+    names: tuple[str, ...] = dtype.names or ()
+    if not names:
+        raise ValueError('The readings have no elements with values.')
+    if values.size % len(names):
+        raise ValueError(f'{values.size} values do not form readings of {len(names)} elements.')
+    columns = values.reshape(-1, len(names))
+    records = np.empty(len(columns), dtype=dtype)
+    for index, name in enumerate(names):
+        records[name] = columns[:, index]
+    return records
+
 
 class KeithleyBufferMixin:
     class BufferSource(StrEnum):
@@ -52,13 +143,45 @@ class KeithleyBufferMixin:
 
     buffer_data = list_control(
         float,
-        """Get the buffer data.""",
+        """Get the values of all elements of the readings in the buffer.""",
         ':TRAC:DATA?',
+        get_format=lambda value: parse_values(value).tolist(),
+        snapshot=False,
     )
 
     def buffer_clear(self : MessageProtocol) -> None:
         self.send(':TRAC:CLE')
 
+    def buffer_array(self: Instrument, binary: bool | None = None) -> npt.NDArray[np.float64]:
+        """Read all elements of all readings in the buffer into one array.
+
+        By default the data is transferred as binary block of doubles if the adapter supports
+        binary transfers, and as ASCII otherwise. Set the format elements to the reading only to
+        get one value per reading.
+        """
+        if binary is None:
+            binary = self.adapter.supports_binary
+        if not binary:
+            return parse_values(self.query(':TRAC:DATA?'))
+        self.send_many([':FORM:DATA DREAL', ':FORM:BORD SWAP'])
+        try:
+            block = self.query_block(':TRAC:DATA?')
+        finally:
+            self.send(':FORM:DATA ASC')
+        return np.frombuffer(block, dtype='<f8')
+
+    def buffer_records(
+        self: Instrument, elements: Sequence[str] | None = None, binary: bool | None = None
+    ) -> npt.NDArray[Any]:
+        """Read the buffer into a structured array with one field per format element.
+
+        The elements default to the format elements configured in the instrument, which are queried
+        once and then kept up to date by the format controls.
+        """
+        if elements is None:
+            elements = _format_elements(self)
+        return readings_from_values(KeithleyBufferMixin.buffer_array(self, binary), reading_dtype(elements))
+
 
 
 class KeithleyMixin:
@@ -68,6 +191,9 @@ class KeithleyMixin:
             'write_termination': '\n',
         }
     }
+    command_separator: ClassVar = ';'
+    completion_query: ClassVar = '*OPC?'
+    configure_order: ClassVar = ('function', '*', 'initiate_continuous_enabled')
 
     class ChannelFunction(StrEnum):
         Voltage = '"VOLT:DC"'
@@ -100,18 +226,24 @@ class KeithleyMixin:
         float,
         """Fetch the latest post-processed reading.""",
         ':FETC?',
+        pre_format=_reading,
+        snapshot=False,
     )
 
     read = basic_control(
         float,
         """Performs an ABORt, INITiate, and a FETCh?.""",
         ':READ?',
+        pre_format=_reading,
+        snapshot=False,
     )
 
     fresh = basic_control(
         float,
         """Return a new (fresh) reading. Waits if no reading is available.""",
         ':SENS:DATA:FRESh?',
+        pre_format=_reading,
+        snapshot=False,
     )
 
     function = enum_control(
@@ -184,15 +316,61 @@ class KeithleyMixin:
         validate=in_range_inc(4, 7),
     )
 
-    format = enum_control(
+    format = basic_control(
         FormatElement,
         """Set the element returned in the reading.""",
         ':FORM:ELEM?',
         ':FORM:ELEM %s',
+        set_format=lambda value: value.value,
+        validate=lambda _, value: value in KeithleyMixin.FormatElement,
+        written=lambda self, value: _remember_elements(self, [value]),
     )
 
+    format_elements = list_control(
+        FormatElement,
+        """Get/set the elements returned for each reading.
+
+        The elements are remembered, so readings are parsed without querying them.""",
+        ':FORM:ELEM?',
+        ':FORM:ELEM %s',
+        pre_format=_read_elements,
+        validate=lambda _, value: bool(value),
+        written=_remember_elements,
+    )
+
+    def reset(self: Instrument) -> None:
+        """Executes a device reset, the format elements are queried again on their next use."""
+        SCPIMixin.reset(self)
+        _remember_elements(self, None)
+
     def abort(self: MessageProtocol) -> None:
         self.send(':ABOR')
 
     def initiate(self: MessageProtocol) -> None:
         self.send(':INIT')
+
+    def measure(self: Instrument, timeout: float | None = None, trigger: bool = False) -> float:
+        """Initiate a measurement, wait until it completed and fetch the reading.
+
+        Other than :attr:`read`, the bus is free while the instrument measures and the wait blocks
+        on a service request where the adapter supports it. Continuous initiation must be disabled.
+        With ``trigger`` a bus trigger is sent after arming, e.g. for the trigger source ``BUS``.
+        """
+        self.send_many([':ABOR', ':INIT', *(['*TRG'] if trigger else [])])
+        SCPIMixin.wait_complete(self, timeout)
+        return float(_reading(self, self.query(':FETC?')))
+
+    def fetch_records(self: Instrument, elements: Sequence[str] | None = None) -> npt.NDArray[Any]:
+        """Fetch the latest readings as structured array with one field per format element.
+
+        The elements default to the configured format elements, see :meth:`buffer_records`.
+        """
+        if elements is None:
+            elements = _format_elements(self)
+        return parse_readings(self.query(':FETC?'), elements)
+
+    def read_records(self: Instrument, elements: Sequence[str] | None = None) -> npt.NDArray[Any]:
+        """Trigger and read new readings as structured array, see :meth:`fetch_records`."""
+        if elements is None:
+            elements = _format_elements(self)
+        return parse_readings(self.query(':READ?'), elements)
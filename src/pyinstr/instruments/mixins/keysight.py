@@ -5,13 +5,49 @@ This file is part of PyINSTR.
 :license: MIT, see LICENSE for more details.
 """
 
+import math
 from enum import IntFlag, StrEnum
-from typing import ClassVar
+from typing import Any, ClassVar
 
-from pyinstr import BoolFormat, MessageProtocol, basic_control, bool_control, enum_control, flag_control, list_control
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr import (
+    BoolFormat,
+    Instrument,
+    MessageProtocol,
+    StatusRegister,
+    basic_control,
+    bool_control,
+    enum_control,
+    flag_control,
+    list_control,
+)
 from pyinstr.adapters import VISAAdapter
 from pyinstr.instruments.channels import KeysightControlChannel, KeysightPinChannel
 
+LIST_MAX_POINTS = 512
+LIST_MAX_DWELL = 262.144
+ARB_MAX_POINTS = 65535
+ARB_CDW_DWELL = (1e-5, 0.3)
+
+
+def _join(values: npt.NDArray[Any]) -> str:
+    return ','.join(np.char.mod('%.7g', values))
+
+
+def _mask(steps: npt.ArrayLike | None, length: int) -> npt.NDArray[np.bool_]:
+    if steps is None:
+        return np.zeros(length, dtype=np.bool_)
+    steps = np.asarray(steps)
+    if steps.dtype == np.bool_:
+        return steps
+    mask = np.zeros(length, dtype=np.bool_)
+    if steps.size and (steps.min() < -length or steps.max() >= length):
+        raise ValueError(f'Trigger steps {steps} exceed the {length} steps.')
+    mask[steps] = True
+    return mask
+
 
 class KeysightListMixin:
     class ListStep(StrEnum):
@@ -53,6 +89,212 @@ class KeysightListMixin:
         'LIST:TOUT:EOST %s',
     )
 
+    def upload_list(self: Instrument, sequence: 'ListSequence', verify: bool = True, compare: bool = False) -> None:
+        """Validate the list against the limits of the instrument and upload it in one transaction.
+
+        With ``verify`` the number of points of all lists and the error queue are checked. With
+        ``compare`` the complete level and dwell time lists are read back and compared as well, which
+        transfers the whole list a second time.
+        """
+        function = sequence.function
+        minimum, maximum = (float(value) for value in self.query_many([f'{function}? MIN', f'{function}? MAX']))
+        sequence.validate(minimum, maximum)
+        self.send_many(sequence.commands())
+        if verify:
+            queries = [f'LIST:{function}:POIN?', 'LIST:DWEL:POIN?', 'LIST:TOUT:BOST:POIN?', 'LIST:TOUT:EOST:POIN?']
+            *points, error = self.query_many([*queries, 'SYST:ERR?'])
+            if int(error.split(',', 1)[0]) != 0:
+                raise ValueError(f'Upload of the list failed with "{error}".')
+            if any(int(float(value)) != len(sequence) for value in points):
+                raise ValueError(f'Upload of the list failed, the instrument holds {points} points.')
+        if compare:
+            levels, dwells = (
+                np.array(value.split(','), dtype=np.float64)
+                for value in self.query_many([f'LIST:{function}?', 'LIST:DWEL?'])
+            )
+            if not (
+                np.allclose(levels, sequence.levels, rtol=1e-6, atol=1e-9)
+                and np.allclose(dwells, sequence.dwells, rtol=1e-6, atol=1e-9)
+            ):
+                raise ValueError('The uploaded list differs from the sequence.')
+
+
+class ListSequence:
+    """Transient list of a Keysight supply, validated and uploaded as a whole.
+
+    ``function`` is ``'VOLT'`` or ``'CURR'``. A scalar dwell time applies to all steps. Trigger
+    outputs at the beginning or end of steps are given as boolean mask or as step indices.
+    """
+
+    def __init__(
+        self,
+        function: str,
+        levels: npt.ArrayLike,
+        dwells: npt.ArrayLike,
+        trigger_begin: npt.ArrayLike | None = None,
+        trigger_end: npt.ArrayLike | None = None,
+        count: float = 1,
+        step: KeysightListMixin.ListStep = KeysightListMixin.ListStep.Auto,
+    ) -> None:
+        if function not in ('VOLT', 'CURR'):
+            raise ValueError(f'Invalid list function {function}.')
+        self.function = function
+        self.levels = np.atleast_1d(np.asarray(levels, dtype=np.float64))
+        dwells = np.asarray(dwells, dtype=np.float64)
+        self.dwells = np.full(self.levels.shape, dwells) if dwells.ndim == 0 else dwells
+        self.trigger_begin = _mask(trigger_begin, len(self))
+        self.trigger_end = _mask(trigger_end, len(self))
+        self.count = count
+        self.step = step
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def validate(
+        self,
+        minimum: float = -math.inf,
+        maximum: float = math.inf,
+        max_points: int = LIST_MAX_POINTS,
+        max_dwell: float = LIST_MAX_DWELL,
+    ) -> None:
+        """Check all steps at once, raising a ValueError which lists every violation."""
+        errors: list[str] = []
+        if not 1 <= len(self) <= max_points:
+            errors.append(f'The list has {len(self)} steps, but 1 to {max_points} are supported.')
+        for name, values in (
+            ('dwell times', self.dwells),
+            ('begin triggers', self.trigger_begin),
+            ('end triggers', self.trigger_end),
+        ):
+            if len(values) != len(self):
+                errors.append(f'The list has {len(self)} levels but {len(values)} {name}.')
+        invalid = np.flatnonzero(~np.isfinite(self.levels) | (self.levels < minimum) | (self.levels > maximum))
+        if invalid.size:
+            errors.append(f'Levels of steps {invalid[:10].tolist()} are outside of [{minimum}, {maximum}].')
+        if len(self.dwells) == len(self):
+            invalid = np.flatnonzero(~np.isfinite(self.dwells) | (self.dwells < 0.0) | (self.dwells > max_dwell))
+            if invalid.size:
+                errors.append(f'Dwell times of steps {invalid[:10].tolist()} are outside of [0, {max_dwell}].')
+        if not (self.count == math.inf or (float(self.count).is_integer() and 1 <= self.count <= 256)):
+            errors.append(f'Invalid repetition count {self.count}.')
+        if errors:
+            raise ValueError(' '.join(errors))
+
+    def commands(self) -> list[str]:
+        """Commands programming the list, the mode of the function is set to list."""
+        return [
+            f'{self.function}:MODE LIST',
+            f'LIST:{self.function} {_join(self.levels)}',
+            f'LIST:DWEL {_join(self.dwells)}',
+            f'LIST:TOUT:BOST {_join(self.trigger_begin.astype(np.int8))}',
+            f'LIST:TOUT:EOST {_join(self.trigger_end.astype(np.int8))}',
+            f'LIST:COUN {"INF" if self.count == math.inf else int(self.count)}',
+            f'LIST:STEP {self.step}',
+        ]
+
+
+class ArbWaveform:
+    """Arbitrary waveform of a Keysight supply, validated and uploaded as a whole.
+
+    ``function`` is ``'VOLT'`` or ``'CURR'``. A scalar dwell time defines a constant-dwell
+    waveform of up to 65535 points which is uploaded as binary block, an array of dwell times a
+    user-defined waveform of up to 512 points. Trigger outputs at the beginning of points are only
+    supported by user-defined waveforms and are given as boolean mask or as point indices. With
+    ``last`` the output remains at the last point after the waveform completed.
+    """
+
+    def __init__(
+        self,
+        function: str,
+        levels: npt.ArrayLike,
+        dwell: npt.ArrayLike,
+        trigger_begin: npt.ArrayLike | None = None,
+        count: float = 1,
+        last: bool = True,
+    ) -> None:
+        if function not in ('VOLT', 'CURR'):
+            raise ValueError(f'Invalid waveform function {function}.')
+        self.function = function
+        self.levels = np.atleast_1d(np.asarray(levels, dtype=np.float64))
+        dwell = np.asarray(dwell, dtype=np.float64)
+        self.constant_dwell = dwell.ndim == 0
+        self.dwells = np.full(self.levels.shape, dwell) if self.constant_dwell else dwell
+        if trigger_begin is not None and self.constant_dwell:
+            raise ValueError('Trigger outputs require a user-defined waveform.')
+        self.trigger_begin = _mask(trigger_begin, len(self))
+        self.count = count
+        self.last = last
+
+    @property
+    def shape(self) -> str:
+        return 'CDW' if self.constant_dwell else 'UDEF'
+
+    @property
+    def duration(self) -> float:
+        """Duration of one repetition in seconds."""
+        return float(self.dwells.sum())
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def validate(
+        self,
+        minimum: float = -math.inf,
+        maximum: float = math.inf,
+        max_slew: float = math.inf,
+    ) -> None:
+        """Check all points at once, raising a ValueError which lists every violation.
+
+        Steps between points which can not be completed within the dwell time of the new point at
+        the slew rate ``max_slew`` in (V|A)/s are violations as well.
+        """
+        errors: list[str] = []
+        max_points = ARB_MAX_POINTS if self.constant_dwell else LIST_MAX_POINTS
+        if not 2 <= len(self) <= max_points:
+            errors.append(f'The waveform has {len(self)} points, but 2 to {max_points} are supported.')
+        for name, values in (('dwell times', self.dwells), ('begin triggers', self.trigger_begin)):
+            if len(values) != len(self):
+                errors.append(f'The waveform has {len(self)} levels but {len(values)} {name}.')
+        invalid = np.flatnonzero(~np.isfinite(self.levels) | (self.levels < minimum) | (self.levels > maximum))
+        if invalid.size:
+            errors.append(f'Levels of points {invalid[:10].tolist()} are outside of [{minimum}, {maximum}].')
+        if len(self.dwells) == len(self):
+            low, high = ARB_CDW_DWELL if self.constant_dwell else (0.0, LIST_MAX_DWELL)
+            invalid = np.flatnonzero(~np.isfinite(self.dwells) | (self.dwells < low) | (self.dwells > high))
+            if invalid.size:
+                errors.append(f'Dwell times of points {invalid[:10].tolist()} are outside of [{low}, {high}].')
+            elif len(self) > 1:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    slew = np.abs(np.diff(self.levels)) / self.dwells[1:]
+                invalid = np.flatnonzero(slew > max_slew) + 1
+                if invalid.size:
+                    errors.append(f'Steps to points {invalid[:10].tolist()} exceed the slew rate of {max_slew:g}.')
+        if not (self.count == math.inf or (float(self.count).is_integer() and 1 <= self.count <= 16777216)):
+            errors.append(f'Invalid repetition count {self.count}.')
+        if errors:
+            raise ValueError(' '.join(errors))
+
+    def setup(self) -> list[str]:
+        """Commands configuring the waveform without its points."""
+        commands = [f'ARB:FUNC:TYPE {self.function}', f'ARB:FUNC:SHAP {self.shape}']
+        if self.constant_dwell:
+            commands.append(f'ARB:{self.function}:CDW:DWEL {self.dwells[0]:.7g}')
+        commands.append(f'ARB:COUN {"INF" if self.count == math.inf else int(self.count)}')
+        commands.append(f'ARB:TERM:LAST {int(self.last)}')
+        return commands
+
+    def commands(self) -> list[str]:
+        """Commands programming the waveform with its points in ASCII, the mode of the function is set to ARB."""
+        arb = f'ARB:{self.function}:{self.shape}'
+        if self.constant_dwell:
+            points = [f'{arb} {_join(self.levels)}']
+        else:
+            points = [
+                f'{arb}:LEV {_join(self.levels)}',
+                f'{arb}:DWEL {_join(self.dwells)}',
+                f'{arb}:BOST {_join(self.trigger_begin.astype(np.int8))}',
+            ]
+        return [*self.setup(), *points, f'{self.function}:MODE ARB']
 
 
 class KeysightSupplyMixin:
@@ -62,11 +304,27 @@ class KeysightSupplyMixin:
             'write_termination': '\n',
         }
     }
+    command_separator: ClassVar = ';'
+    completion_query: ClassVar = '*OPC?'
+    configure_order: ClassVar = ('function', '*', 'output_enabled')
 
     class PriorityMode(StrEnum):
         Current = 'CURR'
         Voltage = 'VOLT'
 
+    class TriggerSource(StrEnum):
+        Bus = 'BUS'
+        Immediate = 'IMM'
+        External = 'EXT'
+        Pin1 = 'PIN1'
+        Pin2 = 'PIN2'
+        Pin3 = 'PIN3'
+        Pin4 = 'PIN4'
+        Pin5 = 'PIN5'
+        Pin6 = 'PIN6'
+        Pin7 = 'PIN7'
+        Transient = 'TRAN1'
+
     class OperationStatus(IntFlag):
         ConstantVoltage = 0x1
         ConstantCurrent = 0x2
@@ -94,6 +352,11 @@ class KeysightSupplyMixin:
         DynamicProtection = 0x1000
         SenseFault = 0x2000
 
+    status_registers: ClassVar = {
+        OperationStatus: StatusRegister.scpi('STAT:OPER', 0x80),
+        QuestionableStatus: StatusRegister.scpi('STAT:QUES1', 0x8),
+    }
+
     current = KeysightControlChannel.make('CURR')
     voltage = KeysightControlChannel.make('VOLT')
     pins = KeysightPinChannel.make_multiple(*range(1, 8))
@@ -133,6 +396,153 @@ class KeysightSupplyMixin:
         'STEP:TOUT %s',
     )
 
+    transient_trigger_source = enum_control(
+        TriggerSource,
+        """Get/set the source which triggers the transient system.""",
+        'TRIG:TRAN:SOUR?',
+        'TRIG:TRAN:SOUR %s',
+    )
+
+    def upload_arb(self: Instrument, waveform: ArbWaveform, verify: bool = True) -> None:
+        """Validate the waveform against the limits of the instrument and upload it in one transaction.
+
+        The slew rate of the output is checked as well. Constant-dwell waveforms are transferred as
+        binary block if the adapter supports it. With ``verify`` the number of points and the error
+        queue are checked.
+        """
+        function = waveform.function
+        minimum, maximum, slew = (
+            float(value) for value in self.query_many([f'{function}? MIN', f'{function}? MAX', f'{function}:SLEW?'])
+        )
+        waveform.validate(minimum, maximum, slew)
+        if waveform.constant_dwell and self.adapter.supports_binary:
+            self.send_many([*waveform.setup(), 'FORM REAL', 'FORM:BORD SWAP'])
+            self.send_block(f'ARB:{function}:CDW ', waveform.levels.astype('<f4').tobytes())
+            self.send_many(['FORM ASC', f'{function}:MODE ARB'])
+        else:
+            self.send_many(waveform.commands())
+        if verify:
+            arb = f'ARB:{function}:{waveform.shape}'
+            queries = [f'{arb}:POIN?'] if waveform.constant_dwell else [f'{arb}:LEV:POIN?', f'{arb}:DWEL:POIN?']
+            *points, error = self.query_many([*queries, 'SYST:ERR?'])
+            if int(error.split(',', 1)[0]) != 0:
+                raise ValueError(f'Upload of the waveform failed with "{error}".')
+            if any(int(float(value)) != len(waveform) for value in points):
+                raise ValueError(f'Upload of the waveform failed, the instrument holds {points} points.')
+
+    acquisition_trigger_source = enum_control(
+        TriggerSource,
+        """Get/set the source which triggers the acquisition system.""",
+        'TRIG:ACQ:SOUR?',
+        'TRIG:ACQ:SOUR %s',
+    )
+
+    sample_interval = basic_control(
+        float,
+        """Get/set the time between the samples of an acquisition in seconds.""",
+        'SENS:SWE:TINT?',
+        'SENS:SWE:TINT %g',
+    )
+
+    sample_points = basic_control(
+        int,
+        """Get/set the number of samples of an acquisition.""",
+        'SENS:SWE:POIN?',
+        'SENS:SWE:POIN %d',
+    )
+
+    sample_offset = basic_control(
+        int,
+        """Get/set the offset of the samples relative to the trigger, negative offsets are pre-trigger samples.""",
+        'SENS:SWE:OFFS:POIN?',
+        'SENS:SWE:OFFS:POIN %d',
+    )
+
+    def configure_capture(
+        self: Instrument,
+        interval: float,
+        points: int,
+        trigger: TriggerSource,
+        offset: int = 0,
+    ) -> None:
+        """Configure the digitizer in one transaction.
+
+        If the acquisition is triggered by a digital pin, the pin is configured as trigger input.
+        """
+        commands = [
+            f'SENS:SWE:TINT {interval:g}',
+            f'SENS:SWE:POIN {points:d}',
+            f'SENS:SWE:OFFS:POIN {offset:d}',
+            f'TRIG:ACQ:SOUR {trigger}',
+        ]
+        if trigger.startswith('PIN'):
+            commands.insert(0, f'DIG:{trigger}:FUNC {KeysightPinChannel.Function.TriggerInput}')
+        self.send_many(commands)
+
+    def initiate_capture(self: MessageProtocol) -> None:
+        self.send('INIT:ACQ')
+
+    def trigger_capture(self: MessageProtocol) -> None:
+        self.send('TRIG:ACQ:IMM')
+
+    def fetch_capture(
+        self: Instrument,
+        voltage: bool = True,
+        current: bool = True,
+        binary: bool | None = None,
+        timeout: float | None = None,
+    ) -> npt.NDArray[Any]:
+        """Wait for the acquisition to complete and read it into a structured array.
+
+        The array has a ``time`` field relative to the trigger in seconds and a field for each of
+        the fetched functions. By default the samples are transferred as binary blocks if the
+        adapter supports binary transfers, and as ASCII otherwise. ``timeout`` bounds the wait for
+        the trigger and the acquisition.
+        """
+        functions = [
+            (name, node) for name, node, fetch in (('voltage', 'VOLT', voltage), ('current', 'CURR', current)) if fetch
+        ]
+        interval, offset = self.query_many(['SENS:SWE:TINT?', 'SENS:SWE:OFFS:POIN?'])
+        if binary is None:
+            binary = self.adapter.supports_binary
+        arrays: list[npt.NDArray[Any]] = []
+        if binary:
+            self.send_many(['FORM REAL', 'FORM:BORD SWAP'])
+        try:
+            for _, node in functions:
+                query = f'FETC:ARR:{node}?'
+                if binary:
+                    arrays.append(np.frombuffer(self.query_block(query, timeout=timeout), dtype='<f4'))
+                else:
+                    arrays.append(np.array(self.query(query, timeout=timeout).split(','), dtype=np.float32))
+        finally:
+            if binary:
+                self.send('FORM ASC')
+        points = len(arrays[0]) if arrays else int(self.query('SENS:SWE:POIN?'))
+        records = np.empty(points, dtype=[('time', np.float64)] + [(name, np.float32) for name, _ in functions])
+        records['time'] = (np.arange(points) + int(float(offset))) * float(interval)
+        for (name, _), values in zip(functions, arrays, strict=True):
+            records[name] = values
+        return records
+
+    def capture(
+        self: Instrument,
+        voltage: bool = True,
+        current: bool = True,
+        trigger: bool = False,
+        timeout: float | None = None,
+    ) -> npt.NDArray[Any]:
+        """Initiate a configured acquisition and fetch it once triggered.
+
+        With ``trigger`` the acquisition is triggered by a bus trigger, otherwise it waits for its
+        configured trigger source, e.g. a pulse at a trigger input pin.
+        """
+        self.send_many(['INIT:ACQ', 'TRIG:ACQ:IMM'] if trigger else ['INIT:ACQ'])
+        return KeysightSupplyMixin.fetch_capture(self, voltage, current, timeout=timeout)
+
+    def abort_transient(self: MessageProtocol) -> None:
+        self.send('ABOR:TRAN')
+
     def inititate_transient(self: MessageProtocol) -> None:
         self.send('INIT:IMM:TRAN')
 
@@ -19,6 +19,7 @@ class MercuryMixin:
             'write_termination': '\n',
         }
     }
+    pipeline_depth: ClassVar = 8
 
     catalogue = basic_control(
         str,
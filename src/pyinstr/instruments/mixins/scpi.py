@@ -5,10 +5,41 @@ This file is part of PyINSTR.
 :license: MIT, see LICENSE for more details.
 """
 
-from pyinstr import MessageProtocol, basic_control
+import time
+from collections.abc import Sequence
+from enum import IntFlag
+from typing import ClassVar
+
+from pyinstr import Instrument, MessageProtocol, StatusRegister, basic_control, claim_events, forward_events
 
 
 class SCPIMixin:
+    class StandardEvent(IntFlag):
+        OperationComplete = 0x1
+        RequestControl = 0x2
+        QueryError = 0x4
+        DeviceError = 0x8
+        ExecutionError = 0x10
+        CommandError = 0x20
+        UserRequest = 0x40
+        PowerOn = 0x80
+
+    class StatusByte(IntFlag):
+        ErrorQueue = 0x4
+        Questionable = 0x8
+        MessageAvailable = 0x10
+        EventSummary = 0x20
+        RequestService = 0x40
+        Operation = 0x80
+
+    status_registers: ClassVar = {
+        StandardEvent: StatusRegister('*ESR?', '*ESE %d', StatusByte.EventSummary),
+    }
+
+    def concatenate(self, commands: Sequence[str]) -> str:
+        """Join commands into one message, starting each header from the root of the command tree."""
+        return ';'.join(command if command.startswith((':', '*')) else f':{command}' for command in commands)
+
     def clear_status(self: MessageProtocol) -> None:
         self.send('*CLS')
 
@@ -24,6 +55,7 @@ class SCPIMixin:
         """Reads and clears event status enable register.""",
         '*ESR?',
         None,
+        snapshot=False,
     )
 
     identity = basic_control(
@@ -40,6 +72,7 @@ class SCPIMixin:
         '%s',
         get_format=lambda value: value == '1',
         set_format=lambda value: '*OPC' if value else '',
+        snapshot=False,
     )
 
     def reset(self: MessageProtocol) -> None:
@@ -49,8 +82,8 @@ class SCPIMixin:
     service_enable = basic_control(
         int,
         """Gets/sets bits in the service request enable register.""",
-        '*ESE?',
-        '*ESE %d',
+        '*SRE?',
+        '*SRE %d',
     )
 
     status = basic_control(
@@ -64,8 +97,60 @@ class SCPIMixin:
         """Issues the self test query.""",
         '*TST?',
         None,
+        snapshot=False,
     )
 
     def wait(self: MessageProtocol) -> None:
         """Inserts a waiting barrier between commands on the device."""
         self.send('*WAI')
+
+    def wait_complete(self: Instrument, timeout: float | None = None, max_interval: float = 0.1) -> None:
+        """Wait until all pending operations have been completed.
+
+        ``*OPC`` sets the operation complete event once all pending operations finished. If the
+        adapter supports service requests, the event summary bit raises a request and the call blocks
+        on it. Otherwise the status byte is polled, starting at 1 ms and doubling the interval up to
+        ``max_interval`` seconds. The enable registers are restored afterwards.
+
+        Other events read from the event status register are forwarded to the status monitors, and
+        an operation complete event read by a monitor completes the wait.
+        """
+        event = SCPIMixin.StandardEvent
+        summary = SCPIMixin.StatusByte.EventSummary
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # reading the event status register clears stale events, subscribers still receive them
+        event_enable, service_enable, stale = (int(value) for value in self.query_many(['*ESE?', '*SRE?', '*ESR?']))
+        forward_events(self, event(stale))
+        claim_events(self, event.OperationComplete)
+        adapter = self.adapter
+        srq = adapter.supports_srq
+        if srq:
+            adapter.enable_srq()
+        try:
+            self.send_many(
+                [f'*ESE {event_enable | event.OperationComplete}', f'*SRE {service_enable | summary}', '*OPC']
+            )
+            interval = 1e-3
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0.0:
+                    raise TimeoutError(f'Pending operations did not complete within {timeout} s.')
+                if srq:
+                    ready = adapter.wait_srq(remaining) and bool(self.read_stb() & summary)
+                else:
+                    ready = bool(int(self.query('*STB?')) & summary)
+                if claim_events(self, event.OperationComplete):
+                    return
+                # other enabled events also set the summary bit
+                if ready:
+                    latched = event(int(self.query('*ESR?')))
+                    forward_events(self, latched & ~event.OperationComplete)
+                    if latched & event.OperationComplete:
+                        return
+                if not srq:
+                    time.sleep(interval if remaining is None else min(interval, remaining))
+                    interval = min(2.0 * interval, max_interval)
+        finally:
+            if srq:
+                adapter.disable_srq()
+            self.send_many([f'*ESE {event_enable}', f'*SRE {service_enable}'])
@@ -0,0 +1,134 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import copy
+import math
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr import Instrument
+from pyinstr.instruments.channels import KeysightPinChannel
+from pyinstr.instruments.mixins import (
+    KeithleyBufferMixin,
+    KeithleyMixin,
+    KeysightListMixin,
+    ListSequence,
+    SCPIMixin,
+)
+
+METER_MAX_READINGS = 1024
+
+
+class TriggeredSweep:
+    """Source/measure sweep paced by the hardware of a Keysight supply and a Keithley meter.
+
+    The list of the supply steps through the levels on its own timing. At the beginning of every
+    step it emits a pulse at the digital pin ``pin``, which has to be wired to the trigger link
+    input of the meter. The meter waits for ``delay`` seconds after each trigger for the output to
+    settle, stores one reading in its buffer and is read out once the list completed, so the
+    sweep costs a few transactions regardless of the number of points. The dwell times of the
+    list must cover the delay and the measurement time of the meter.
+
+    .. code-block:: python
+
+        sweep = TriggeredSweep(supply, meter, pin=1, delay=0.01)
+        result = sweep.run(ListSequence('VOLT', np.linspace(0, 1, 500), 0.05))
+        plt.plot(result['source'], result['reading'])
+    """
+
+    def __init__(
+        self,
+        supply: Instrument,
+        meter: Instrument,
+        pin: int = 1,
+        delay: float = 0.0,
+        polarity: KeysightPinChannel.Polarity = KeysightPinChannel.Polarity.Positive,
+    ) -> None:
+        if not 1 <= pin <= 7:
+            raise ValueError(f'Invalid pin {pin}.')
+        self.supply = supply
+        self.meter = meter
+        self.pin = pin
+        self.delay = delay
+        self.polarity = polarity
+        self._sequence: ListSequence | None = None
+
+    @staticmethod
+    def points(sequence: ListSequence) -> int:
+        """Number of readings of a sweep over the sequence, including all repetitions."""
+        if sequence.count == math.inf:
+            raise ValueError('A sweep requires a finite repetition count.')
+        return len(sequence) * int(sequence.count)
+
+    def configure(self, sequence: ListSequence) -> None:
+        """Upload the list to the supply and arm the meter for one external trigger per step."""
+        points = self.points(sequence)
+        if points > METER_MAX_READINGS:
+            raise ValueError(f'The sweep has {points} points, but the buffer holds {METER_MAX_READINGS} readings.')
+        sequence = copy.copy(sequence)
+        sequence.trigger_begin = np.ones(len(sequence), dtype=np.bool_)
+        self.supply.send_many(
+            [
+                'ABOR:TRAN',
+                f'DIG:PIN{self.pin}:FUNC {KeysightPinChannel.Function.TriggerOutput}',
+                f'DIG:PIN{self.pin}:POL {self.polarity}',
+                'TRIG:TRAN:SOUR BUS',
+            ]
+        )
+        KeysightListMixin.upload_list(self.supply, sequence)
+        self.meter.send_many(
+            [
+                ':ABOR',
+                ':INIT:CONT OFF',
+                ':TRIG:SOUR EXT',
+                f':TRIG:DEL {self.delay:g}',
+                f':TRIG:COUN {points}',
+                ':SAMP:COUN 1',
+                ':TRAC:CLE',
+                f':TRAC:POIN {max(points, 2)}',
+                ':TRAC:FEED SENS',
+                ':TRAC:FEED:CONT NEXT',
+                KeithleyMixin.format_elements.encode(self.meter, [KeithleyMixin.FormatElement.Reading]),
+                ':INIT',
+            ]
+        )
+        KeithleyMixin.format_elements.written(self.meter, [KeithleyMixin.FormatElement.Reading])
+        self._sequence = sequence
+
+    def start(self) -> None:
+        """Start the configured sweep, it runs without further communication."""
+        if self._sequence is None:
+            raise RuntimeError('The sweep is not configured.')
+        self.supply.send_many(['INIT:TRAN', '*TRG'])
+
+    def fetch(self, timeout: float | None = None) -> npt.NDArray[Any]:
+        """Wait until the meter took all readings and return them aligned with the source levels.
+
+        The structured array has the fields ``step`` (index into the list), ``source`` (programmed
+        level) and ``reading``.
+        """
+        sequence = self._sequence
+        if sequence is None:
+            raise RuntimeError('The sweep is not configured.')
+        points = self.points(sequence)
+        SCPIMixin.wait_complete(self.meter, timeout)
+        readings = KeithleyBufferMixin.buffer_array(self.meter)
+        if len(readings) != points:
+            raise ValueError(f'The meter took {len(readings)} of {points} readings, check the trigger wiring.')
+        result = np.empty(points, dtype=[('step', '<i8'), ('source', '<f8'), ('reading', '<f8')])
+        result['step'] = np.tile(np.arange(len(sequence)), points // len(sequence))
+        result['source'] = sequence.levels[result['step']]
+        result['reading'] = readings
+        return result
+
+    def run(self, sequence: ListSequence, timeout: float | None = None) -> npt.NDArray[Any]:
+        """Configure, start and fetch a sweep, see :meth:`fetch`."""
+        self.configure(sequence)
+        self.start()
+        return self.fetch(timeout)
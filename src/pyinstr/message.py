@@ -5,15 +5,25 @@ This file is part of PyINSTR.
 :license: MIT, see LICENSE for more details.
 """
 
+import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from collections.abc import Callable
-from contextlib import nullcontext
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+from itertools import batched
 from types import TracebackType
 from typing import Any, ClassVar, Protocol, override, runtime_checkable
 
 from pyinstr.property import Property
+from pyinstr.retry import RetryPolicy, RetryStats
+from pyinstr.scheduler import IOScheduler
+from pyinstr.timeout import AdaptiveTimeout
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
 
 
 class Adapter(ABC):
@@ -29,18 +39,87 @@ class Adapter(ABC):
     def apply(self, options: dict[str, Any]) -> None:
         pass
 
+    @property
+    def bus(self) -> Hashable | None:
+        """Identifier of the physical bus shared with other adapters, None if the adapter has its own."""
+        return None
+
+    @property
+    def timeout(self) -> float | None:
+        """Timeout of a read in seconds, None if the adapter has no adjustable timeout."""
+        return None
+
+    @timeout.setter
+    def timeout(self, timeout: float) -> None:
+        raise ValueError(f'{type(self).__name__} has no adjustable timeout.')
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """Whether the error is transient (e.g. a timeout), so that repeating the transaction may succeed."""
+        return isinstance(exc, TimeoutError | ConnectionError)
+
+    def clear(self) -> None:
+        """Discard pending input and output, e.g. the late response of a timed out query.
+
+        Adapters without such a facility do nothing.
+        """
+        return
+
+    @property
+    def supports_binary(self) -> bool:
+        """Whether the adapter can read binary block responses."""
+        return False
+
+    def read_block(self) -> bytes:
+        """Read an IEEE 488.2 binary block response and return its payload."""
+        raise NotImplementedError(f'{type(self).__name__} does not support binary transfers.')
+
+    def write_block(self, command: str, data: bytes) -> None:
+        """Write the command followed by the data as IEEE 488.2 definite length block."""
+        raise NotImplementedError(f'{type(self).__name__} does not support binary transfers.')
+
+    @property
+    def supports_srq(self) -> bool:
+        """Whether the adapter can wait for service requests of the instrument."""
+        return False
+
+    def enable_srq(self) -> None:
+        """Start queueing service requests, earlier requests are discarded."""
+        raise NotImplementedError(f'{type(self).__name__} does not support service requests.')
+
+    def disable_srq(self) -> None:
+        raise NotImplementedError(f'{type(self).__name__} does not support service requests.')
+
+    def wait_srq(self, timeout: float | None = None) -> bool:
+        """Wait for a queued service request, return False if the timeout (in seconds) expired."""
+        raise NotImplementedError(f'{type(self).__name__} does not support service requests.')
+
+    def read_stb(self) -> int:
+        """Read the status byte with a serial poll, bypassing the message queue."""
+        raise NotImplementedError(f'{type(self).__name__} does not support serial polls.')
+
+    def install_srq_handler(self, handler: Callable[[], None]) -> None:
+        """Call the handler (from a thread of the adapter) whenever the instrument requests service."""
+        raise NotImplementedError(f'{type(self).__name__} does not support service requests.')
+
+    def uninstall_srq_handler(self, handler: Callable[[], None]) -> None:
+        raise NotImplementedError(f'{type(self).__name__} does not support service requests.')
+
 
 class MessageBase(ABC):
     @abstractmethod
     def send(self, command: str) -> None: ...
     @abstractmethod
-    def query(self, command: str, delay: float | None = None) -> str: ...
+    def query(
+        self, command: str, delay: float | None = None, *, coalesce: bool = False, timeout: float | None = None
+    ) -> str: ...
 
 
 @runtime_checkable
 class MessageProtocol(Protocol):
     def send(self, command: str) -> None: ...
-    def query(self, command: str, delay: float | None = None) -> str: ...
+    def query(
+        self, command: str, delay: float | None = None, *, coalesce: bool = False, timeout: float | None = None
+    ) -> str: ...
 
 
 class ContextProtocol[T](Protocol):
@@ -60,16 +139,36 @@ _NullContext = nullcontext()
 
 class Instrument(MessageBase):
     adapter_options: ClassVar[dict[type[Adapter], dict[str, Any]]] = {}
+    command_separator: ClassVar[str | None] = None
+    """Separator to concatenate several commands into one message, if supported."""
+    pipeline_depth: ClassVar[int] = 1
+    """Number of queries which can be written before reading their responses."""
+    batch_size: ClassVar[int] = 16
+    """Maximum number of commands combined into one message."""
+    completion_query: ClassVar[str | None] = None
+    """Query which returns once all previous commands have been executed."""
+    configure_order: ClassVar[tuple[str, ...]] = ('*',)
+    """Order in which controls are applied by :meth:`configure`, ``'*'`` stands for all other controls."""
 
     def __init__(
         self,
         adapter: Adapter,
         context: ContextProtocol[Any] = _NullContext,
+        scheduler: IOScheduler | None = None,
     ) -> None:
         self._context = context
         self._adapter = adapter
+        self._scheduler = scheduler
         self._resolver: Callable[[BaseException, int], bool] | None = None
         self._retries = 10
+        self._retry_policy: RetryPolicy | None = None
+        self._retry_stats = RetryStats()
+        self._adaptive_timeout: AdaptiveTimeout | None = None
+        self._coalesce_window = 0.0
+        self._inflight: dict[tuple[str, float | None], Future[str]] = {}
+        self._recent: dict[tuple[str, float | None], tuple[float, str]] = {}
+        self._writes = 0
+        self._inflight_lock = threading.Lock()
 
         if (options := self.adapter_options.get(type(self._adapter))) is not None:
             self._adapter.apply(options)
@@ -78,6 +177,32 @@ class Instrument(MessageBase):
     def adapter(self) -> Adapter:
         return self._adapter
 
+    @property
+    def bus(self) -> Hashable:
+        """Identifier of the bus of the adapter, instruments with the same bus can not communicate in parallel."""
+        bus = self._adapter.bus
+        return ('adapter', id(self._adapter)) if bus is None else bus
+
+    @property
+    def scheduler(self) -> IOScheduler | None:
+        """Scheduler executing all I/O on the worker of the bus, allowing calls from any thread, if set."""
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: IOScheduler | None) -> None:
+        self._scheduler = scheduler
+
+    @property
+    def coalesce_window(self) -> float:
+        """Time in seconds in which the response of a coalesced query is reused by identical queries."""
+        return self._coalesce_window
+
+    @coalesce_window.setter
+    def coalesce_window(self, window: float) -> None:
+        self._coalesce_window = window
+        with self._inflight_lock:
+            self._recent.clear()
+
     @property
     def resolver(self) -> Callable[[BaseException, int], bool] | None:
         return self._resolver
@@ -94,45 +219,292 @@ class Instrument(MessageBase):
     def retires(self, retries: int) -> None:
         self._retries = retries
 
+    @property
+    def retry_policy(self) -> RetryPolicy | None:
+        """Policy for retries of failed transactions, replacing ``resolver`` and ``retries`` if set."""
+        return self._retry_policy
+
+    @retry_policy.setter
+    def retry_policy(self, policy: RetryPolicy | None) -> None:
+        self._retry_policy = policy
+
+    @property
+    def retry_stats(self) -> RetryStats:
+        return self._retry_stats
+
+    @property
+    def adaptive_timeout(self) -> AdaptiveTimeout | None:
+        """Timeouts learned from the observed latency for queries without an explicit timeout, if set."""
+        return self._adaptive_timeout
+
+    @adaptive_timeout.setter
+    def adaptive_timeout(self, adaptive: AdaptiveTimeout | None) -> None:
+        self._adaptive_timeout = adaptive
+
+    def _policy(self) -> RetryPolicy:
+        if self._retry_policy is not None:
+            return self._retry_policy
+        # without a policy, retry immediately as long as the resolver asks to
+        resolver = self._resolver
+        return RetryPolicy(
+            attempts=max(self._retries, 1),
+            backoff=0.0,
+            jitter=0.0,
+            retryable=(lambda _exc, _attempt: False) if resolver is None else resolver,
+        )
+
+    @contextmanager
+    def _override_timeout(self, timeout: float | None, remaining: float | None, clear: bool = True) -> Iterator[None]:
+        # use the timeout of the call, but never exceed the remaining time of the deadline
+        current = self._adapter.timeout
+        if current is None or (timeout is None and remaining is None):
+            yield
+            return
+        target = current if timeout is None else timeout
+        if remaining is not None:
+            target = min(target, max(remaining, 1e-3))
+        if target == current:
+            yield
+            return
+        self._adapter.timeout = target
+        try:
+            yield
+        except BaseException as exc:
+            # a response arriving after the shortened timeout would be read by the next query
+            if clear and target < current and self._adapter.is_transient(exc):
+                self._clear()
+            raise
+        finally:
+            self._adapter.timeout = current
+
+    def _clear(self) -> None:
+        try:
+            self._adapter.clear()
+        except Exception as exc:
+            log.warning(f'Clearing {self._adapter} failed: {exc}')
+
+    def _attempt[R](self, action: Callable[[], R], timeout: float | None, remaining: float | None) -> R:
+        def attempt() -> R:
+            with self._context, self._override_timeout(timeout, remaining):
+                return action()
+
+        if self._scheduler is not None:
+            return self._scheduler.run(self.bus, attempt, id(self))
+        return attempt()
+
+    def _transact[R](self, action: Callable[[], R], timeout: float | None = None) -> R:
+        policy = self._policy()
+        stats = self._retry_stats
+        stats.calls += 1
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            remaining = None if policy.deadline is None else policy.deadline - (time.monotonic() - start)
+            try:
+                # each attempt is a job of its own, so the bus serves other clients during the backoff
+                return self._attempt(action, timeout, remaining)
+            except BaseException as exc:
+                if not policy.should_retry(exc, attempt, self._adapter.is_transient(exc)):
+                    stats.failures += 1
+                    raise
+                delay = policy.delay(attempt)
+                if policy.deadline is not None and time.monotonic() - start + delay >= policy.deadline:
+                    stats.failures += 1
+                    stats.deadline_exceeded += 1
+                    raise TimeoutError(
+                        f'Deadline of {policy.deadline} s exceeded after {attempt + 1} attempts.'
+                    ) from exc
+                stats.retries += 1
+                attempt += 1
+            if delay > 0.0:
+                time.sleep(delay)
+
+    def _write_read(self, command: str, delay: float | None, learned: float | None = None) -> str:
+        self._adapter.write(command)
+        if delay is not None:
+            time.sleep(delay)
+        adaptive = self._adaptive_timeout
+        if adaptive is None:
+            return self._adapter.read()
+        start = time.perf_counter()
+        try:
+            # the learned timeout only shortens the timeout in effect
+            with self._override_timeout(learned, self._adapter.timeout, clear=not adaptive.fallback):
+                response = self._adapter.read()
+        except BaseException as exc:
+            adaptive.miss(command)
+            if learned is None or not adaptive.fallback or not self._adapter.is_transient(exc):
+                raise
+            # the response may still arrive, e.g. after a longer integration time, so keep waiting
+            response = self._adapter.read()
+        adaptive.record(command, time.perf_counter() - start)
+        return response
+
+    def _pipeline(self, commands: Sequence[str]) -> list[str]:
+        for command in commands:
+            self._adapter.write(command)
+        return [self._adapter.read() for _ in commands]
+
+    def _invalidate(self) -> None:
+        # a write may change any value, so responses of earlier reads must not be reused
+        with self._inflight_lock:
+            self._writes += 1
+            self._recent.clear()
+
     @override
     def send(self, command: str) -> None:
         if command == '':
             return
-        for i in range(self._retries):
-            try:
-                with self._context:
-                    self._adapter.write(command)
-                    return
-                self._adapter.write(command)
-            except BaseException as exc:
-                if self._resolver is not None:
-                    # should retry?
-                    if self._resolver(exc, i):
-                        continue
-                raise exc
+        try:
+            self._transact(lambda: self._adapter.write(command))
+        finally:
+            self._invalidate()
 
     @override
-    def query(self, command: str, delay: float | None = None) -> str:
+    def query(
+        self, command: str, delay: float | None = None, *, coalesce: bool = False, timeout: float | None = None
+    ) -> str:
+        """Write the command and read the response.
+
+        With ``coalesce`` the query is considered free of side effects: callers issuing an identical
+        query while it is in flight (or within the coalesce window) share its response. The ``timeout``
+        in seconds replaces the adapter timeout (and the adaptive timeout) for this query only. If the
+        response does not arrive within a timeout shorter than the adapter timeout, the adapter is
+        cleared so that a late response is not read by the next query.
+        """
         if command == '':
             return ''
-        for i in range(self._retries):
+        learned = None
+        if timeout is None and self._adaptive_timeout is not None:
+            learned = self._adaptive_timeout.timeout(command)
+
+        def action() -> str:
+            return self._transact(lambda: self._write_read(command, delay, learned), timeout)
+
+        if coalesce:
+            return self._coalesce((command, delay), action)
+        try:
+            return action()
+        finally:
+            self._invalidate()
+
+    def send_block(self, command: str, data: bytes) -> None:
+        """Send the command with binary data, e.g. the points of a waveform."""
+        try:
+            self._transact(lambda: self._adapter.write_block(command, data))
+        finally:
+            self._invalidate()
+
+    def query_block(self, command: str, delay: float | None = None, *, timeout: float | None = None) -> bytes:
+        """Write the command and read its response as binary block, e.g. the data of a buffer."""
+
+        def write_read() -> bytes:
+            self._adapter.write(command)
+            if delay is not None:
+                time.sleep(delay)
+            return self._adapter.read_block()
+
+        return self._transact(write_read, timeout)
+
+    def read_stb(self) -> int:
+        """Read the status byte with a serial poll of the adapter, e.g. after a service request."""
+        return self._transact(lambda: self._adapter.read_stb())
+
+    def _coalesce(self, key: tuple[str, float | None], action: Callable[[], str]) -> str:
+        with self._inflight_lock:
+            if self._coalesce_window > 0.0 and (recent := self._recent.get(key)) is not None:
+                if time.monotonic() - recent[0] < self._coalesce_window:
+                    return recent[1]
+            future = self._inflight.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+            writes = self._writes
+        if not leader:
+            return future.result()
+        try:
+            response = action()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+        future.set_result(response)
+        if self._coalesce_window > 0.0:
+            now = time.monotonic()
+            with self._inflight_lock:
+                self._recent = {
+                    other: entry for other, entry in self._recent.items() if now - entry[0] < self._coalesce_window
+                }
+                # a response read while the instrument was written may be outdated already
+                if writes == self._writes:
+                    self._recent[key] = (now, response)
+        return response
+
+    def concatenate(self, commands: Sequence[str]) -> str:
+        """Join several commands into a single message using the command separator."""
+        if self.command_separator is None:
+            raise ValueError(f'{type(self).__name__} does not support concatenated commands.')
+        return self.command_separator.join(commands)
+
+    def send_many(self, commands: Sequence[str]) -> None:
+        """Send several commands, concatenated into as few messages as supported by the instrument."""
+        if self.command_separator is None:
+            for command in commands:
+                self.send(command)
+            return
+        for chunk in batched(commands, self.batch_size):
+            self.send(self.concatenate(chunk))
+
+    def query_many(self, commands: Sequence[str], coalesce: bool = False, timeout: float | None = None) -> list[str]:
+        """Query several commands using the fastest strategy supported by the instrument.
+
+        Commands are concatenated into a single message if the instrument defines a command separator,
+        pipelined if it accepts several queries in flight, and queried one by one otherwise. Concatenated
+        and single queries are coalesced with identical queries of other callers if ``coalesce`` is set.
+        """
+        responses: list[str] = []
+        if self.command_separator is not None:
+            for chunk in batched(commands, self.batch_size):
+                response = self.query(self.concatenate(chunk), coalesce=coalesce, timeout=timeout)
+                parts = response.split(self.command_separator)
+                if len(parts) != len(chunk):
+                    raise ValueError(f'Expected {len(chunk)} responses but received "{response}".')
+                responses.extend(parts)
+        elif self.pipeline_depth > 1:
             try:
-                with self._context:
-                    self._adapter.write(command)
-                    if delay is not None:
-                        time.sleep(delay)
-                    return self._adapter.read()
-                self._adapter.write(command)
-                if delay is not None:
-                    time.sleep(delay)
-                return self._adapter.read()
-            except BaseException as exc:
-                if self._resolver is not None:
-                    # should retry?
-                    if self._resolver(exc, i):
-                        continue
-                raise exc
-        return ''
+                for chunk in batched(commands, self.pipeline_depth):
+                    responses.extend(self._transact(lambda chunk=chunk: self._pipeline(chunk), timeout))
+            finally:
+                if not coalesce:
+                    self._invalidate()
+        else:
+            responses.extend(self.query(command, coalesce=coalesce, timeout=timeout) for command in commands)
+        return responses
+
+    def snapshot(
+        self,
+        include: Sequence[str] | None = None,
+        exclude: Sequence[str] | None = None,
+    ) -> dict[str, Any]:
+        """Read all readable controls of the instrument and its channels.
+
+        See :func:`pyinstr.tree.snapshot` for details.
+        """
+        from pyinstr.tree import snapshot
+
+        return snapshot(self, include=include, exclude=exclude)
+
+    def configure(self, settings: dict[Any, Any], diff: bool = False) -> dict[str, Any]:
+        """Apply a nested dictionary of control values to the instrument and its channels.
+
+        See :func:`pyinstr.tree.configure` for details.
+        """
+        from pyinstr.tree import configure
+
+        return configure(self, settings, diff=diff)
 
     def close(self) -> None:
         with self._context:
@@ -245,13 +617,31 @@ class Channel[P: MessageProtocol](MessageBase):
     def name(self) -> str:
         return self._channel_id
 
+    @property
+    def root(self) -> MessageProtocol:
+        """The instrument (or other non-channel parent) the channel belongs to."""
+        if isinstance(self._parent, Channel):
+            return self._parent.root
+        return self._parent
+
+    def resolve(self, command: str) -> str:
+        """Substitute the placeholders of this channel and all parent channels."""
+        command = command.format_map({self._placeholder: self._channel_id})
+        if isinstance(self._parent, Channel):
+            return self._parent.resolve(command)
+        return command
+
     @override
     def send(self, command: str) -> None:
         self._parent.send(command.format_map({self._placeholder: self._channel_id}))
 
     @override
-    def query(self, command: str, delay: float | None = None) -> str:
-        return self._parent.query(command.format_map({self._placeholder: self._channel_id}), delay)
+    def query(
+        self, command: str, delay: float | None = None, *, coalesce: bool = False, timeout: float | None = None
+    ) -> str:
+        return self._parent.query(
+            command.format_map({self._placeholder: self._channel_id}), delay, coalesce=coalesce, timeout=timeout
+        )
 
     @classmethod
     def make[T: Channel[MessageProtocol]](
@@ -0,0 +1,223 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass
+from queue import Queue
+from types import TracebackType
+from typing import Any, Self
+
+from pyinstr.message import Instrument, MessageProtocol
+from pyinstr.scheduler import Priority, priority
+from pyinstr.tree import ControlNode, find_control, read_controls
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+
+@dataclass(frozen=True)
+class Sample:
+    """A polled value, or the exception raised while reading it."""
+
+    signal: str
+    timestamp: float
+    value: Any
+
+
+@dataclass
+class Signal:
+    name: str
+    node: ControlNode
+    period: float
+    due: float = 0.0
+    overruns: int = 0
+    latency: float = 0.0
+
+
+def _bus_key(node: ControlNode) -> Hashable:
+    root = node.root
+    return root.bus if isinstance(root, Instrument) else id(root)
+
+
+class Poller:
+    """Polls controls of several instruments at individual rates.
+
+    Each bus gets its own worker thread, so independent instruments are read in parallel while
+    reads on the same bus never collide. Due signals of a bus are read together using the
+    batched queries of the instrument. Signals are scheduled on a fixed time grid, so jitter of a
+    single read does not accumulate. If a signal misses its next slot, the slot is skipped and an
+    overrun is reported. Reads are issued with :attr:`Priority.Polling`, so instruments using an
+    :class:`IOScheduler` serve interactive and control commands first.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Sample], None] | None = None,
+        queue: Queue[Sample] | None = None,
+        overrun: Callable[[str, int], None] | None = None,
+    ) -> None:
+        self._listeners: list[Callable[[Sample], None]] = [] if callback is None else [callback]
+        self._queue = queue
+        self._overrun = overrun
+        self._signals: dict[str, Signal] = {}
+        self._workers: dict[Hashable, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._running = False
+
+    @property
+    def signals(self) -> dict[str, Signal]:
+        with self._lock:
+            return dict(self._signals)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def overruns(self) -> dict[str, int]:
+        with self._lock:
+            return {name: signal.overruns for name, signal in self._signals.items()}
+
+    def add(
+        self,
+        target: MessageProtocol,
+        path: str | Sequence[str],
+        period: float,
+        name: str | None = None,
+    ) -> str:
+        """Poll the control at ``path`` of an instrument or channel every ``period`` seconds."""
+        if period <= 0.0:
+            raise ValueError('The polling period must be positive.')
+        node = find_control(target, path)
+        if node.control.get_cmd is None:
+            raise ValueError(f'Control {node.name} is not readable.')
+        name = node.name if name is None else name
+        with self._lock:
+            if name in self._signals:
+                raise ValueError(f'Signal {name} is already polled.')
+            self._signals[name] = Signal(name, node, period, due=time.monotonic())
+            if self._running:
+                self._start_worker(_bus_key(node))
+            self._wake.notify_all()
+        return name
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            del self._signals[name]
+
+    def add_listener(self, callback: Callable[[Sample], None]) -> None:
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Sample], None]) -> None:
+        with self._lock:
+            self._listeners.remove(callback)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            now = time.monotonic()
+            for signal in self._signals.values():
+                signal.due = now
+            for key in {_bus_key(signal.node) for signal in self._signals.values()}:
+                self._start_worker(key)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            if worker is not threading.current_thread():
+                worker.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def _start_worker(self, key: Hashable) -> None:
+        if key in self._workers:
+            return
+        worker = threading.Thread(target=self._run, args=(key,), name=f'pyinstr-poller-{key}', daemon=True)
+        self._workers[key] = worker
+        worker.start()
+
+    def _due(self, key: Hashable) -> tuple[list[Signal], float | None]:
+        now = time.monotonic()
+        due: list[Signal] = []
+        next_due: float | None = None
+        for signal in self._signals.values():
+            if _bus_key(signal.node) != key:
+                continue
+            if signal.due <= now:
+                due.append(signal)
+            elif next_due is None or signal.due < next_due:
+                next_due = signal.due
+        return due, next_due
+
+    def _run(self, key: Hashable) -> None:
+        while True:
+            with self._lock:
+                if not self._running:
+                    return
+                due, next_due = self._due(key)
+                if not due:
+                    self._wake.wait(None if next_due is None else next_due - time.monotonic())
+                    continue
+            self._poll(due)
+
+    def _poll(self, due: list[Signal]) -> None:
+        start = time.time()
+        with priority(Priority.Polling):
+            values = read_controls([signal.node for signal in due])
+        stop = time.time()
+        timestamp = 0.5 * (start + stop)
+        now = time.monotonic()
+        overrun: list[Signal] = []
+        with self._lock:
+            listeners = list(self._listeners)
+            for signal in due:
+                signal.latency = stop - start
+                signal.due += signal.period
+                if signal.due <= now:
+                    # skip the missed slots instead of bursting to catch up
+                    missed = int((now - signal.due) // signal.period) + 1
+                    signal.due += missed * signal.period
+                    signal.overruns += missed
+                    overrun.append(signal)
+        for signal in overrun:
+            self._report(signal.name, signal.overruns)
+        for signal, value in zip(due, values, strict=True):
+            sample = Sample(signal.name, timestamp, value)
+            if self._queue is not None:
+                self._queue.put(sample)
+            for listener in listeners:
+                try:
+                    listener(sample)
+                except Exception:
+                    log.exception(f'Listener failed for sample of {signal.name}.')
+
+    def _report(self, name: str, overruns: int) -> None:
+        if self._overrun is not None:
+            self._overrun(name, overruns)
+        else:
+            log.warning(f'Polling of {name} overran its period ({overruns} missed).')
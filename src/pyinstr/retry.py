@@ -0,0 +1,64 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import random
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass
+class RetryStats:
+    """Counters of the transactions of an instrument."""
+
+    calls: int = 0
+    retries: int = 0
+    failures: int = 0
+    deadline_exceeded: int = 0
+
+
+class RetryPolicy:
+    """Decides whether and when a failed transaction is retried.
+
+    Retries wait for an exponentially growing backoff with random jitter. An optional deadline
+    bounds the total duration of a call including all retries. The adapter timeout of an attempt
+    is shortened to the remaining time, so a call never takes much longer than its deadline.
+
+    Whether an error is retried is decided by ``retryable``, by default transient errors of the
+    adapter (e.g. timeouts) are retried while all other errors are raised immediately.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.01,
+        factor: float = 2.0,
+        max_backoff: float = 1.0,
+        jitter: float = 0.1,
+        deadline: float | None = None,
+        retryable: Callable[[BaseException, int], bool] | None = None,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError('At least one attempt is required.')
+        self.attempts = attempts
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retryable = retryable
+
+    def delay(self, attempt: int) -> float:
+        """Backoff in seconds after the failed attempt with index ``attempt`` (starting at 0)."""
+        delay = min(self.max_backoff, self.backoff * self.factor**attempt)
+        return max(0.0, delay * (1.0 + random.uniform(-self.jitter, self.jitter)))
+
+    def should_retry(self, exc: BaseException, attempt: int, transient: bool) -> bool:
+        if attempt + 1 >= self.attempts:
+            return False
+        if self.retryable is not None:
+            return self.retryable(exc, attempt)
+        return transient
@@ -0,0 +1,241 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable, Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any
+
+
+class Priority(IntEnum):
+    """Priority of instrument I/O, higher priorities are served first."""
+
+    Polling = 0
+    Interactive = 1
+    Control = 2
+
+
+_priority: ContextVar[Priority] = ContextVar('pyinstr_priority', default=Priority.Interactive)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Execute the instrument I/O of the current thread (or task) with the given priority.
+
+    .. code-block:: python
+
+        with priority(Priority.Control):
+            supply.output_enabled = False
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@dataclass
+class LatencyStats:
+    """Latency from submission to completion of the jobs of one priority, in seconds."""
+
+    window: int = 1000
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    recent: deque[float] = field(default_factory=deque)
+
+    def add(self, latency: float) -> None:
+        self.count += 1
+        self.total += latency
+        self.maximum = max(self.maximum, latency)
+        self.recent.append(latency)
+        if len(self.recent) > self.window:
+            self.recent.popleft()
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Percentile (0 to 100) of the most recent latencies."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(int(q / 100.0 * len(ordered)), len(ordered) - 1)]
+
+    def merge(self, other: 'LatencyStats') -> None:
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+        self.recent.extend(other.recent)
+        while len(self.recent) > self.window:
+            self.recent.popleft()
+
+
+@dataclass
+class _Job:
+    action: Callable[[], Any]
+    future: Future[Any]
+    priority: Priority
+    submitted: float
+
+
+class BusWorker:
+    """Executes the I/O of one bus in a dedicated thread.
+
+    Jobs of a higher priority are always served first. A job is a complete transaction (e.g. a
+    write followed by its read), so priorities never break the pairing of commands and responses.
+    Within a priority, jobs are queued per client (usually an instrument) and the clients are
+    served round-robin, so a busy instrument cannot starve the other instruments on the same bus.
+    """
+
+    def __init__(self, bus: Hashable) -> None:
+        self._bus = bus
+        self._queues: dict[Priority, OrderedDict[Hashable, deque[_Job]]] = {level: OrderedDict() for level in Priority}
+        self._latency: dict[Priority, LatencyStats] = {level: LatencyStats() for level in Priority}
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f'pyinstr-bus-{bus}', daemon=True)
+        self._thread.start()
+
+    @property
+    def bus(self) -> Hashable:
+        return self._bus
+
+    @property
+    def thread(self) -> threading.Thread:
+        return self._thread
+
+    @property
+    def pending(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queues in self._queues.values() for queue in queues.values())
+
+    @property
+    def latency(self) -> dict[Priority, LatencyStats]:
+        with self._condition:
+            return {level: _copy_stats(stats) for level, stats in self._latency.items()}
+
+    def submit(self, client: Hashable, action: Callable[[], Any], level: Priority | None = None) -> Future[Any]:
+        future: Future[Any] = Future()
+        level = current_priority() if level is None else level
+        with self._condition:
+            if not self._running:
+                raise RuntimeError(f'The worker of bus {self._bus} was stopped.')
+            job = _Job(action, future, level, time.perf_counter())
+            self._queues[level].setdefault(client, deque()).append(job)
+            self._condition.notify()
+        return future
+
+    def stop(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _next(self) -> _Job | None:
+        with self._condition:
+            while self._running and not any(self._queues.values()):
+                self._condition.wait()
+            for level in sorted(Priority, reverse=True):
+                queues = self._queues[level]
+                if not queues:
+                    continue
+                # serve the first client and move it to the end of the line
+                client, queue = queues.popitem(last=False)
+                job = queue.popleft()
+                if queue:
+                    queues[client] = queue
+                return job
+            return None
+
+    def _run(self) -> None:
+        while (job := self._next()) is not None:
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.action())
+            except BaseException as exc:
+                job.future.set_exception(exc)
+            latency = time.perf_counter() - job.submitted
+            with self._condition:
+                self._latency[job.priority].add(latency)
+
+
+def _copy_stats(stats: LatencyStats) -> LatencyStats:
+    copy = LatencyStats(stats.window)
+    copy.merge(stats)
+    return copy
+
+
+class IOScheduler:
+    """Serializes the I/O of each bus while running different buses in parallel.
+
+    Instruments sharing a bus (e.g. a GPIB board) are executed one after another by the worker of
+    that bus, instruments on different buses do not wait for each other.
+    """
+
+    def __init__(self) -> None:
+        self._workers: dict[Hashable, BusWorker] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def buses(self) -> list[Hashable]:
+        with self._lock:
+            return list(self._workers)
+
+    def worker(self, bus: Hashable) -> BusWorker:
+        with self._lock:
+            worker = self._workers.get(bus)
+            if worker is None:
+                worker = BusWorker(bus)
+                self._workers[bus] = worker
+            return worker
+
+    def submit[R](
+        self, bus: Hashable, action: Callable[[], R], client: Hashable = None, level: Priority | None = None
+    ) -> Future[R]:
+        """Queue an action on the worker of a bus, by default with the priority of the calling context."""
+        return self.worker(bus).submit(client, action, level)
+
+    def run[R](
+        self, bus: Hashable, action: Callable[[], R], client: Hashable = None, level: Priority | None = None
+    ) -> R:
+        """Execute an action on the worker of a bus and wait for its result."""
+        worker = self.worker(bus)
+        if worker.thread is threading.current_thread():
+            # already on the bus, e.g. an instrument query issued by another job
+            return action()
+        return worker.submit(client, action, level).result()
+
+    def latency(self, bus: Hashable | None = None) -> dict[Priority, LatencyStats]:
+        """Latency statistics per priority of one bus, or of all buses combined."""
+        with self._lock:
+            workers = list(self._workers.values()) if bus is None else [self._workers[bus]]
+        result = {level: LatencyStats() for level in Priority}
+        for worker in workers:
+            for level, stats in worker.latency.items():
+                result[level].merge(stats)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
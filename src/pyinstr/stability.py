@@ -0,0 +1,174 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from concurrent.futures import CancelledError
+from queue import Empty, SimpleQueue
+
+from pyinstr.message import MessageProtocol
+from pyinstr.poller import Poller, Sample
+from pyinstr.tree import ControlNode, find_control
+
+
+class StabilityDetector:
+    """Detects a value staying within a tolerance band around a target for a time window.
+
+    Each sample is handled in constant (amortized) time: the samples of the window are kept in a
+    queue together with the number of samples outside of the band, so the window is stable once
+    it spans ``window`` seconds without any sample outside of the band. The rate of change is
+    estimated by an exponential moving average of the slope between samples.
+    """
+
+    def __init__(self, target: float, tolerance: float, window: float, smoothing: float = 0.3) -> None:
+        if tolerance < 0.0 or window < 0.0:
+            raise ValueError('The tolerance and window must not be negative.')
+        self.target = target
+        self.tolerance = tolerance
+        self.window = window
+        self.smoothing = smoothing
+        self._samples: deque[tuple[float, bool]] = deque()
+        self._outside = 0
+        self._last: tuple[float, float] | None = None
+        self._rate = math.nan
+
+    @property
+    def rate(self) -> float:
+        """Estimated rate of change per second, NaN until two samples were added."""
+        return self._rate
+
+    @property
+    def value(self) -> float:
+        return math.nan if self._last is None else self._last[1]
+
+    @property
+    def distance(self) -> float:
+        """Distance of the last value from the target."""
+        return abs(self.value - self.target)
+
+    def add(self, timestamp: float, value: float) -> bool:
+        """Add a sample and return whether the value is stable."""
+        if self._last is not None and timestamp > self._last[0]:
+            slope = (value - self._last[1]) / (timestamp - self._last[0])
+            self._rate = slope if math.isnan(self._rate) else self._rate + self.smoothing * (slope - self._rate)
+        self._last = (timestamp, value)
+        inside = abs(value - self.target) <= self.tolerance
+        self._samples.append((timestamp, inside))
+        self._outside += not inside
+        # keep the newest sample before the window, it proves the band was kept from its start
+        while len(self._samples) > 1 and self._samples[1][0] <= timestamp - self.window:
+            _, dropped = self._samples.popleft()
+            self._outside -= not dropped
+        return self.stable
+
+    @property
+    def stable(self) -> bool:
+        if self._last is None or self._outside:
+            return False
+        return self._samples[0][0] <= self._last[0] - self.window
+
+    def reset(self) -> None:
+        self._samples.clear()
+        self._outside = 0
+        self._last = None
+        self._rate = math.nan
+
+    def interval(self, minimum: float, maximum: float) -> float:
+        """Poll interval adapted to the state: fast when the band is about to be reached.
+
+        Outside of the band, half of the time to reach it at the estimated rate is waited. Inside of
+        the band, the window is sampled about ten times.
+        """
+        if self._last is None:
+            return minimum
+        remaining = self.distance - self.tolerance
+        if remaining <= 0.0:
+            interval = self.window / 10.0
+        elif math.isnan(self._rate) or self._rate == 0.0 or (self.value - self.target) * self._rate > 0.0:
+            # moving away from the target or not moving at all
+            interval = maximum
+        else:
+            interval = 0.5 * remaining / abs(self._rate)
+        return min(max(interval, minimum), maximum)
+
+
+def _polled(poller: Poller, node: ControlNode) -> str | None:
+    # the path depends on the object the control was found from, the bound control does not
+    for name, signal in poller.signals.items():
+        if signal.node.owner is node.owner and signal.node.control is node.control:
+            return name
+    return None
+
+
+def wait_until_stable(
+    obj: MessageProtocol,
+    path: str | Sequence[str],
+    target: float,
+    tolerance: float,
+    window: float,
+    timeout: float | None = None,
+    cancel: threading.Event | None = None,
+    poller: Poller | None = None,
+    min_interval: float = 0.01,
+    max_interval: float = 1.0,
+) -> float:
+    """Wait until the control at ``path`` stays within ``tolerance`` of ``target`` for ``window`` seconds.
+
+    The control is read at intervals adapted to its distance from the target and its rate of
+    change, see :meth:`StabilityDetector.interval`. If the control is polled by a running
+    ``poller``, its samples are used instead of reading the control. Concurrent waits on the same
+    control share their reads through the query coalescing of the instrument. Returns the last
+    value. Raises a TimeoutError after ``timeout`` seconds and a CancelledError once ``cancel``
+    is set.
+
+    .. code-block:: python
+
+        loop = itc.temperature_controls['MB1.T1']
+        loop.temperature_setpoint = 4.2
+        wait_until_stable(loop, 'temperature', 4.2, tolerance=0.01, window=60.0, timeout=3600.0)
+    """
+    node = find_control(obj, path)
+    detector = StabilityDetector(target, tolerance, window)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    cancel = threading.Event() if cancel is None else cancel
+    signal = None if poller is None or not poller.running else _polled(poller, node)
+    samples: SimpleQueue[Sample] = SimpleQueue()
+
+    def listener(sample: Sample) -> None:
+        if sample.signal == signal:
+            samples.put(sample)
+
+    if poller is not None and signal is not None:
+        poller.add_listener(listener)
+    try:
+        while True:
+            if cancel.is_set():
+                raise CancelledError(f'Waiting for {node.name} was cancelled.')
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0.0:
+                raise TimeoutError(f'{node.name} was not stable at {target} within {timeout} s.')
+            if signal is not None:
+                try:
+                    sample = samples.get(timeout=max_interval if remaining is None else min(remaining, max_interval))
+                except Empty:
+                    continue
+                if isinstance(sample.value, Exception):
+                    raise sample.value
+                timestamp, value = sample.timestamp, float(sample.value)
+            else:
+                timestamp, value = time.monotonic(), float(node.read())
+            if detector.add(timestamp, value):
+                return value
+            if signal is None:
+                interval = detector.interval(min_interval, max_interval)
+                cancel.wait(interval if remaining is None else min(interval, remaining))
+    finally:
+        if poller is not None and signal is not None:
+            poller.remove_listener(listener)
@@ -0,0 +1,335 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntFlag
+from types import TracebackType
+from typing import Self
+
+from pyinstr.message import Instrument
+from pyinstr.scheduler import Priority, priority
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+
+@dataclass(frozen=True)
+class StatusRegister:
+    """Event register of the SCPI status model, summarized by a bit of the status byte."""
+
+    event_query: str
+    """Query which returns and clears the latched events."""
+    enable_cmd: str
+    """Command setting the events which contribute to the summary bit."""
+    summary: int
+    """Bit of the status byte set while an enabled event is latched."""
+
+    @classmethod
+    def scpi(cls, node: str, summary: int) -> Self:
+        """Register of a SCPI status node, e.g. ``'STAT:QUES'``."""
+        return cls(f'{node}:EVEN?', f'{node}:ENAB %d', summary)
+
+
+def status_registers(instrument: Instrument) -> dict[type[IntFlag], StatusRegister]:
+    """Status registers of an instrument by flag type, collected from its class and mixins."""
+    registers: dict[type[IntFlag], StatusRegister] = {}
+    for cls in reversed(type(instrument).__mro__):
+        registers.update(vars(cls).get('status_registers', {}))
+    return registers
+
+
+@dataclass(frozen=True)
+class StatusEvent:
+    """Events of one status register which occurred since it was read last."""
+
+    instrument: Instrument
+    flags: IntFlag
+    timestamp: float
+
+
+_monitors: 'weakref.WeakSet[StatusMonitor]' = weakref.WeakSet()
+_unclaimed: dict[tuple[int, type[IntFlag]], int] = {}
+_unclaimed_lock = threading.Lock()
+
+
+def forward_events(instrument: Instrument, flags: IntFlag) -> None:
+    """Hand events read from a status register by other code to the monitors of the instrument.
+
+    Reading an event register clears it, so code reading a register which may be subscribed, e.g.
+    ``*ESR?`` while waiting for completion, forwards the events it read.
+    """
+    if not flags:
+        return
+    for monitor in list(_monitors):
+        monitor._forward(instrument, flags)
+
+
+def claim_events[F: IntFlag](instrument: Instrument, flags: F) -> F:
+    """Take the events of the flags which a monitor read from their register without a subscription."""
+    key = (id(instrument), type(flags))
+    with _unclaimed_lock:
+        latched = _unclaimed.get(key, 0)
+        if latched & flags:
+            _unclaimed[key] = latched & ~flags
+    return type(flags)(latched & flags)
+
+
+@dataclass
+class _Subscription:
+    flags: IntFlag
+    callback: Callable[[StatusEvent], None]
+
+
+@dataclass
+class _Monitored:
+    instrument: Instrument
+    subscriptions: list[_Subscription]
+    service_enable: int = 0
+    enabled: set[type[IntFlag]] = field(default_factory=set)
+    srq: bool = False
+    handler: Callable[[], None] | None = None
+
+
+class StatusMonitor:
+    """Delivers status events of instruments to callbacks.
+
+    Subscribing to flags enables them in the enable register of their status register and the
+    summary bit of that register in the service request enable register. Instruments whose
+    adapter supports service requests are checked when the instrument requests service. All
+    other instruments are checked by a single thread which polls their status byte every
+    ``interval`` seconds. Only registers whose summary bit is set are read.
+
+    Reading an event register clears it. Other code reading subscribed registers forwards the events
+    with :func:`forward_events`, and events read by the monitor without a subscription, e.g. the
+    operation complete event, are kept for :func:`claim_events`.
+
+    .. code-block:: python
+
+        monitor = StatusMonitor()
+        monitor.subscribe(supply, supply.QuestionableStatus.CurrentProtection, on_trip)
+        monitor.start()
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self._interval = interval
+        self._monitored: dict[int, _Monitored] = {}
+        self._pending: set[int] = set()
+        self._forwarded: list[StatusEvent] = []
+        self._lock = threading.Lock()
+        self._setup = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._running = False
+        self._thread: threading.Thread | None = None
+        _monitors.add(self)
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def subscribe(self, instrument: Instrument, flags: IntFlag, callback: Callable[[StatusEvent], None]) -> None:
+        """Call ``callback`` whenever one of the flags is latched in its status register."""
+        register = self._register(instrument, type(flags))
+        # the bus is accessed outside of the lock, so the monitor thread keeps delivering events
+        with self._setup:
+            with self._lock:
+                monitored = self._monitored.get(id(instrument))
+            if monitored is None:
+                monitored = _Monitored(instrument, [], int(instrument.query('*SRE?')))
+            # discard events latched before the subscription
+            instrument.query(register.event_query)
+            with self._lock:
+                self._monitored[id(instrument)] = monitored
+                monitored.subscriptions.append(_Subscription(flags, callback))
+                commands = self._enable_commands(monitored)
+                if self._running:
+                    self._install(monitored)
+            instrument.send_many(commands)
+
+    def unsubscribe(self, instrument: Instrument, callback: Callable[[StatusEvent], None]) -> None:
+        with self._setup:
+            with self._lock:
+                monitored = self._monitored[id(instrument)]
+                monitored.subscriptions = [entry for entry in monitored.subscriptions if entry.callback is not callback]
+                commands = self._enable_commands(monitored)
+                if not monitored.subscriptions:
+                    self._uninstall(monitored)
+                    del self._monitored[id(instrument)]
+                    self._pending.discard(id(instrument))
+            instrument.send_many(commands)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            for monitored in self._monitored.values():
+                self._install(monitored)
+            self._thread = threading.Thread(target=self._run, name='pyinstr-status', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._running = False
+            self._wake.notify_all()
+            for monitored in self._monitored.values():
+                self._uninstall(monitored)
+            thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        exc_traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    @staticmethod
+    def _register(instrument: Instrument, type_: type[IntFlag]) -> StatusRegister:
+        register = status_registers(instrument).get(type_)
+        if register is None:
+            raise ValueError(f'{type(instrument).__name__} has no status register for {type_.__name__}.')
+        return register
+
+    def _masks(self, monitored: _Monitored) -> dict[type[IntFlag], int]:
+        masks: dict[type[IntFlag], int] = {}
+        for subscription in monitored.subscriptions:
+            type_ = type(subscription.flags)
+            masks[type_] = masks.get(type_, 0) | int(subscription.flags)
+        return masks
+
+    def _enable_commands(self, monitored: _Monitored) -> list[str]:
+        instrument = monitored.instrument
+        registers = status_registers(instrument)
+        masks = self._masks(monitored)
+        summary = 0
+        commands: list[str] = []
+        # registers without subscriptions left are disabled again
+        for type_ in monitored.enabled | masks.keys():
+            register = registers[type_]
+            mask = masks.get(type_, 0)
+            commands.append(register.enable_cmd % mask)
+            if mask:
+                summary |= register.summary
+        monitored.enabled = set(masks)
+        commands.append(f'*SRE {monitored.service_enable | summary}')
+        return commands
+
+    def _install(self, monitored: _Monitored) -> None:
+        adapter = monitored.instrument.adapter
+        if monitored.handler is not None or not adapter.supports_srq:
+            return
+        key = id(monitored.instrument)
+
+        def handler() -> None:
+            # called by the adapter, the registers are read by the monitor thread
+            with self._lock:
+                self._pending.add(key)
+                self._wake.notify_all()
+
+        adapter.install_srq_handler(handler)
+        monitored.handler = handler
+        monitored.srq = True
+
+    def _uninstall(self, monitored: _Monitored) -> None:
+        if monitored.handler is not None:
+            monitored.instrument.adapter.uninstall_srq_handler(monitored.handler)
+            monitored.handler = None
+            monitored.srq = False
+
+    def _run(self) -> None:
+        due = time.monotonic()
+        while True:
+            with self._lock:
+                while self._running and not self._pending and not self._forwarded and time.monotonic() < due:
+                    self._wake.wait(due - time.monotonic())
+                if not self._running:
+                    return
+                now = time.monotonic()
+                polled = now >= due
+                if polled:
+                    due = now + self._interval
+                checked = [
+                    monitored
+                    for key, monitored in self._monitored.items()
+                    if key in self._pending or (polled and not monitored.srq)
+                ]
+                self._pending.clear()
+                forwarded, self._forwarded = self._forwarded, []
+            for event in forwarded:
+                self._deliver(event)
+            for monitored in checked:
+                try:
+                    self._check(monitored)
+                except Exception:
+                    log.exception(f'Checking the status of {type(monitored.instrument).__name__} failed.')
+
+    def _check(self, monitored: _Monitored) -> None:
+        instrument = monitored.instrument
+        registers = status_registers(instrument)
+        with self._lock:
+            masks = self._masks(monitored)
+            subscriptions = list(monitored.subscriptions)
+        with priority(Priority.Polling):
+            if monitored.srq:
+                status = instrument.read_stb()
+            else:
+                status = int(instrument.query('*STB?'))
+            timestamp = time.time()
+            for type_, mask in masks.items():
+                register = registers[type_]
+                if not status & register.summary:
+                    continue
+                latched = int(instrument.query(register.event_query))
+                if latched & ~mask:
+                    with _unclaimed_lock:
+                        key = (id(instrument), type_)
+                        _unclaimed[key] = _unclaimed.get(key, 0) | (latched & ~mask)
+                flags = type_(latched & mask)
+                if not flags:
+                    continue
+                event = StatusEvent(instrument, flags, timestamp)
+                for subscription in subscriptions:
+                    if type(subscription.flags) is type_ and subscription.flags & flags:
+                        self._dispatch(subscription, event)
+
+    def _forward(self, instrument: Instrument, flags: IntFlag) -> None:
+        # delivered by the monitor thread, like the events read by the monitor
+        with self._lock:
+            monitored = self._monitored.get(id(instrument))
+            if monitored is None:
+                return
+            flags = type(flags)(flags & self._masks(monitored).get(type(flags), 0))
+            if not flags:
+                return
+            self._forwarded.append(StatusEvent(instrument, flags, time.time()))
+            self._wake.notify_all()
+
+    def _deliver(self, event: StatusEvent) -> None:
+        with self._lock:
+            monitored = self._monitored.get(id(event.instrument))
+            subscriptions = [] if monitored is None else list(monitored.subscriptions)
+        for subscription in subscriptions:
+            if type(subscription.flags) is type(event.flags) and subscription.flags & event.flags:
+                self._dispatch(subscription, event)
+
+    @staticmethod
+    def _dispatch(subscription: _Subscription, event: StatusEvent) -> None:
+        try:
+            subscription.callback(event)
+        except Exception:
+            log.exception(f'Status callback for {event.flags!r} failed.')
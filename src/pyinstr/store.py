@@ -0,0 +1,158 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import math
+import threading
+import time
+
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr.poller import Sample
+
+
+def _read_only[T: np.generic](array: npt.NDArray[T]) -> npt.NDArray[T]:
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class RingBuffer:
+    """Fixed size time series of float64 values with int64 timestamps in nanoseconds.
+
+    Every sample is stored twice, at its ring position and one capacity behind it. Thereby any
+    range of the latest samples is contiguous in memory and returned as a view without copying.
+    Views share memory with the buffer and are overwritten once the buffer wrapped around.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError('The capacity must be at least one sample.')
+        self._capacity = capacity
+        self._values = np.full(2 * capacity, np.nan, dtype=np.float64)
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._head = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def total(self) -> int:
+        """Number of samples appended since creation."""
+        return self._head
+
+    def __len__(self) -> int:
+        return min(self._head, self._capacity)
+
+    def append(self, value: float, timestamp: int | None = None) -> None:
+        timestamp = time.time_ns() if timestamp is None else timestamp
+        with self._lock:
+            position = self._head % self._capacity
+            self._values[position] = value
+            self._values[position + self._capacity] = value
+            self._timestamps[position] = timestamp
+            self._timestamps[position + self._capacity] = timestamp
+            self._head += 1
+
+    def extend(self, values: npt.ArrayLike, timestamps: npt.ArrayLike | None = None) -> None:
+        """Append many samples, e.g. the readings of an instrument buffer, in one vectorized step."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if timestamps is None:
+            times = np.full(values.size, time.time_ns(), dtype=np.int64)
+        else:
+            times = np.asarray(timestamps, dtype=np.int64).ravel()
+        if times.size != values.size:
+            raise ValueError('The number of values and timestamps differ.')
+        with self._lock:
+            skipped = max(values.size - self._capacity, 0)
+            positions = (self._head + skipped + np.arange(values.size - skipped)) % self._capacity
+            for offset in (0, self._capacity):
+                self._values[positions + offset] = values[skipped:]
+                self._timestamps[positions + offset] = times[skipped:]
+            self._head += values.size
+
+    def _range(self, count: int | None = None) -> tuple[int, int]:
+        size = len(self) if count is None else min(count, len(self))
+        end = self._head % self._capacity + self._capacity
+        return end - size, end
+
+    def latest(self, count: int | None = None) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Views of the timestamps and values of the latest ``count`` (default all) samples."""
+        with self._lock:
+            start, stop = self._range(count)
+        return _read_only(self._timestamps[start:stop]), _read_only(self._values[start:stop])
+
+    def window(
+        self, start: int | None = None, stop: int | None = None
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Views of all samples with ``start <= timestamp < stop`` (in nanoseconds).
+
+        Timestamps are expected to be appended in increasing order.
+        """
+        with self._lock:
+            first, last = self._range()
+        times = self._timestamps[first:last]
+        lower = 0 if start is None else int(np.searchsorted(times, start, side='left'))
+        upper = times.size if stop is None else int(np.searchsorted(times, stop, side='left'))
+        return _read_only(times[lower:upper]), _read_only(self._values[first + lower : first + upper])
+
+    def downsample(
+        self, step: int, start: int | None = None, stop: int | None = None
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Strided views with every ``step``-th sample of a time window."""
+        if step < 1:
+            raise ValueError('The step must be at least one.')
+        times, values = self.window(start, stop)
+        return times[::step], values[::step]
+
+    def to_numpy(self) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Copies of the timestamps and values of all stored samples."""
+        times, values = self.latest()
+        return times.copy(), values.copy()
+
+
+class TimeSeriesStore:
+    """Ring buffers of a fixed capacity for named signals.
+
+    The ``append`` method can be registered as listener of a :class:`pyinstr.Poller`. Failed reads
+    and values which cannot be converted to float are stored as NaN.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._buffers: dict[str, RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._buffers)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._buffers
+
+    def __getitem__(self, name: str) -> RingBuffer:
+        return self._buffers[name]
+
+    def buffer(self, name: str, capacity: int | None = None) -> RingBuffer:
+        """Get the buffer of a signal, creating it on first use."""
+        buffer = self._buffers.get(name)
+        if buffer is None:
+            with self._lock:
+                buffer = self._buffers.setdefault(name, RingBuffer(self._capacity if capacity is None else capacity))
+        return buffer
+
+    def append(self, sample: Sample) -> None:
+        try:
+            value = float(sample.value)
+        except (TypeError, ValueError):
+            value = math.nan
+        self.buffer(sample.signal).append(value, int(sample.timestamp * 1e9))
+
+    def to_numpy(self) -> dict[str, tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]]:
+        return {name: buffer.to_numpy() for name, buffer in self._buffers.items()}
@@ -0,0 +1,296 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from pyinstr.message import Instrument, MessageProtocol
+from pyinstr.poller import Poller
+from pyinstr.stability import wait_until_stable
+from pyinstr.tree import ControlNode, find_control, read_controls
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+type Settle = Callable[[ControlNode, Any], None]
+"""Blocks after a control was set to a value until the value is established."""
+
+
+def settle_time(delay: float) -> Settle:
+    """Settle for a fixed time."""
+
+    def wrapper(_node: ControlNode, _value: Any) -> None:
+        time.sleep(delay)
+
+    return wrapper
+
+
+def settle_tolerance(
+    tolerance: float,
+    readback: tuple[MessageProtocol, str | Sequence[str]] | None = None,
+    interval: float = 0.05,
+    timeout: float | None = None,
+) -> Settle:
+    """Settle until a readback is within ``tolerance`` of the set value.
+
+    The readback is the set control itself unless another control is given, e.g. the measured
+    field of a magnet whose setpoint is swept.
+    """
+
+    def wrapper(node: ControlNode, value: Any) -> None:
+        control = node if readback is None else find_control(*readback)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while abs(control.read() - value) > tolerance:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f'{control.name} did not settle within {timeout} s.')
+            time.sleep(interval)
+
+    return wrapper
+
+
+def settle_stable(
+    tolerance: float,
+    window: float,
+    readback: tuple[MessageProtocol, str | Sequence[str]] | None = None,
+    timeout: float | None = None,
+    poller: Poller | None = None,
+) -> Settle:
+    """Settle until a readback stays within ``tolerance`` of the set value for ``window`` seconds.
+
+    See :func:`wait_until_stable`, the readback is the set control itself unless another control is
+    given.
+    """
+
+    def wrapper(node: ControlNode, value: Any) -> None:
+        owner, path = (node.owner, node.path[-1:]) if readback is None else readback
+        wait_until_stable(owner, path, value, tolerance, window, timeout=timeout, poller=poller)
+
+    return wrapper
+
+
+def settle_complete(timeout: float | None = None) -> Settle:
+    """Settle until the instrument of the control completed all pending operations (``*OPC?``)."""
+
+    def wrapper(node: ControlNode, _value: Any) -> None:
+        root = node.root
+        if isinstance(root, Instrument) and root.completion_query is not None:
+            root.query(root.completion_query, timeout=timeout)
+
+    return wrapper
+
+
+@dataclass(frozen=True)
+class Axis:
+    name: str
+    node: ControlNode
+    values: npt.NDArray[Any]
+    settle: Settle | None
+
+
+@dataclass(frozen=True)
+class Output:
+    name: str
+    node: ControlNode
+    dtype: npt.DTypeLike
+
+
+class Sweep:
+    """Sweeps writable controls over a grid of points and reads output controls at each point.
+
+    Axes are nested in the order they are added, the first axis is the outermost. At each point
+    the changed axes are set, each settles with its condition, and the outputs are read with the
+    batched queries of their instruments. The results are written into a preallocated structured
+    array with the shape of the grid, holding a field per axis, per output and the ``timestamp``.
+
+    With ``pipeline`` the outputs of a point are read in the background while the next point is set
+    and settles. This is only safe if the outputs keep their value of the point until they are
+    read, e.g. readings latched by the settle condition or a trigger. Instruments used by axes and
+    outputs alike, or sharing a bus, need an :class:`IOScheduler` then, as they are accessed from two
+    threads, and :meth:`run` raises a ValueError otherwise.
+
+    .. code-block:: python
+
+        sweep = Sweep()
+        magnet = ips.magnet_controls['GRPZ']
+        sweep.add_axis(magnet, 'field_setpoint', np.linspace(0, 1, 11), settle_tolerance(1e-3, (magnet, 'field')))
+        sweep.add_axis(supply, 'voltage.value', np.linspace(0, 5, 101), settle_complete())
+        sweep.add_output(meter, 'fetch')
+        results = sweep.run()
+    """
+
+    def __init__(self, pipeline: bool = False) -> None:
+        self.pipeline = pipeline
+        self._axes: list[Axis] = []
+        self._outputs: list[Output] = []
+
+    @property
+    def axes(self) -> list[Axis]:
+        return list(self._axes)
+
+    @property
+    def outputs(self) -> list[Output]:
+        return list(self._outputs)
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return tuple(len(axis.values) for axis in self._axes)
+
+    def add_axis(
+        self,
+        target: MessageProtocol,
+        path: str | Sequence[str],
+        values: npt.ArrayLike,
+        settle: Settle | None = None,
+        name: str | None = None,
+    ) -> str:
+        """Sweep the control at ``path`` over the values, nested inside the axes added before."""
+        node = find_control(target, path)
+        if node.control.set_cmd is None:
+            raise ValueError(f'Control {node.name} is not writable.')
+        values = np.asarray(values)
+        if values.ndim != 1 or not len(values):
+            raise ValueError(f'The values of {node.name} must be a non-empty sequence.')
+        name = node.name if name is None else name
+        self._check_name(name)
+        self._axes.append(Axis(name, node, values, settle))
+        return name
+
+    def add_output(
+        self,
+        target: MessageProtocol,
+        path: str | Sequence[str],
+        name: str | None = None,
+        dtype: npt.DTypeLike = np.float64,
+    ) -> str:
+        """Read the control at ``path`` at every point."""
+        node = find_control(target, path)
+        if node.control.get_cmd is None:
+            raise ValueError(f'Control {node.name} is not readable.')
+        name = node.name if name is None else name
+        self._check_name(name)
+        self._outputs.append(Output(name, node, dtype))
+        return name
+
+    def _check_name(self, name: str) -> None:
+        if name == 'timestamp' or any(entry.name == name for entry in (*self._axes, *self._outputs)):
+            raise ValueError(f'The name {name} is already used.')
+
+    def dtype(self) -> np.dtype[Any]:
+        """Record layout of the results."""
+        return np.dtype(
+            [
+                *((axis.name, axis.values.dtype) for axis in self._axes),
+                *((output.name, output.dtype) for output in self._outputs),
+                ('timestamp', np.float64),
+            ]
+        )
+
+    def allocate(self) -> npt.NDArray[Any]:
+        """Results of a sweep with the axis values filled in, outputs are NaN until read."""
+        results = np.zeros(self.shape, dtype=self.dtype())
+        grids = np.meshgrid(*(axis.values for axis in self._axes), indexing='ij')
+        for axis, grid in zip(self._axes, grids, strict=True):
+            results[axis.name] = grid
+        for name in (*(output.name for output in self._outputs), 'timestamp'):
+            if np.issubdtype(results.dtype[name], np.floating):
+                results[name] = math.nan
+        return results
+
+    def run(
+        self,
+        results: npt.NDArray[Any] | None = None,
+        callback: Callable[[tuple[int, ...], npt.NDArray[Any]], None] | None = None,
+        cancel: threading.Event | None = None,
+    ) -> npt.NDArray[Any]:
+        """Run the sweep and return the results.
+
+        The results are written into ``results`` if given, e.g. an array shared with a live plot,
+        otherwise into a new array from :meth:`allocate`. ``callback`` is called with the index and
+        the record of every completed point. If ``cancel`` is set, the sweep stops after the current
+        point and the remaining points keep their initial values.
+        """
+        if not self._axes:
+            raise ValueError('The sweep has no axes.')
+        if results is None:
+            results = self.allocate()
+        elif results.shape != self.shape or results.dtype != self.dtype():
+            raise ValueError('The results do not match the shape and layout of the sweep.')
+        if self.pipeline:
+            self._check_pipeline()
+        nodes = [output.node for output in self._outputs]
+        previous: tuple[Any, ...] | None = None
+        pending: Future[None] | None = None
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='pyinstr-sweep') as executor:
+            try:
+                for index in np.ndindex(self.shape):
+                    if cancel is not None and cancel.is_set():
+                        break
+                    point = tuple(axis.values[i].item() for axis, i in zip(self._axes, index, strict=True))
+                    changed = [
+                        (axis, value)
+                        for position, (axis, value) in enumerate(zip(self._axes, point, strict=True))
+                        if previous is None or previous[position] != value
+                    ]
+                    for axis, value in changed:
+                        axis.node.control.__set__(axis.node.owner, value)
+                    for axis, value in changed:
+                        if axis.settle is not None:
+                            axis.settle(axis.node, value)
+                    previous = point
+                    # at most one point is read in the background, so the readings stay in order
+                    if pending is not None:
+                        pending.result()
+                        pending = None
+                    if self.pipeline:
+                        pending = executor.submit(self._measure, nodes, results, index, callback)
+                    else:
+                        self._measure(nodes, results, index, callback)
+            finally:
+                if pending is not None:
+                    pending.result()
+        return results
+
+    def _check_pipeline(self) -> None:
+        axes = [axis.node.root for axis in self._axes]
+        outputs = [output.node.root for output in self._outputs]
+        shared = {root.bus for root in axes if isinstance(root, Instrument)} & {
+            root.bus for root in outputs if isinstance(root, Instrument)
+        }
+        for root in (*axes, *outputs):
+            if isinstance(root, Instrument) and root.bus in shared and root.scheduler is None:
+                raise ValueError(f'{type(root).__name__} is used by axes and outputs and needs an IOScheduler.')
+
+    def _measure(
+        self,
+        nodes: Sequence[ControlNode],
+        results: npt.NDArray[Any],
+        index: tuple[int, ...],
+        callback: Callable[[tuple[int, ...], npt.NDArray[Any]], None] | None,
+    ) -> None:
+        start = time.time()
+        values = read_controls(nodes)
+        record = results[index]
+        record['timestamp'] = 0.5 * (start + time.time())
+        for output, value in zip(self._outputs, values, strict=True):
+            if isinstance(value, Exception):
+                log.warning(f'Reading {output.name} at point {index} failed: {value}')
+                continue
+            record[output.name] = value
+        if callback is not None:
+            try:
+                callback(index, record)
+            except Exception:
+                log.exception(f'Sweep callback failed at point {index}.')
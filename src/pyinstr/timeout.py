@@ -0,0 +1,109 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+from pyinstr.scheduler import LatencyStats
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def command_template(command: str) -> str:
+    """Template of a command with all numeric arguments replaced, e.g. ``'SOUR:VOLT #'``."""
+    return _NUMBER.sub('#', command)
+
+
+@dataclass
+class _Template:
+    stats: LatencyStats
+    timeout: float | None = None
+    scale: float = 1.0
+    misses: int = 0
+    samples: int = 0
+
+
+class AdaptiveTimeout:
+    """Timeouts learned from the observed latency of each command template.
+
+    Once ``warmup`` responses of a template were observed, its timeout is the ``percentile`` of the
+    recent latencies multiplied by ``factor``, bounded by ``minimum`` and ``maximum``. An instrument
+    which does not answer is therefore detected after a multiple of its usual response time instead
+    of the fixed adapter timeout, which it never exceeds. A read exceeding the learned timeout
+    clears the adapter, fails and doubles the timeout of its template, so commands which became
+    slower (e.g. a longer integration time) adapt after a few failures. With ``fallback`` such a
+    read keeps waiting up to the adapter timeout instead, so it succeeds at the cost of detecting
+    an instrument which does not answer only after the adapter timeout. Until the warmup completed
+    the adapter timeout applies.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 99.0,
+        factor: float = 3.0,
+        minimum: float = 0.02,
+        maximum: float | None = None,
+        window: int = 100,
+        warmup: int = 10,
+        fallback: bool = False,
+    ) -> None:
+        self.percentile = percentile
+        self.factor = factor
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.warmup = warmup
+        self.fallback = fallback
+        self._templates: dict[str, _Template] = {}
+        self._lock = threading.Lock()
+
+    def _template(self, command: str) -> _Template:
+        key = command_template(command)
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates.setdefault(key, _Template(LatencyStats(self.window)))
+        return template
+
+    def timeout(self, command: str) -> float | None:
+        """Learned timeout of the command in seconds, None while it is still learned."""
+        with self._lock:
+            template = self._template(command)
+            if template.timeout is None:
+                return None
+            timeout = template.timeout * template.scale
+            return timeout if self.maximum is None else min(timeout, self.maximum)
+
+    def record(self, command: str, latency: float) -> None:
+        """Add the observed latency of a response."""
+        with self._lock:
+            template = self._template(command)
+            template.stats.add(latency)
+            template.samples += 1
+            # sorting the window is cheap, but only needed for slow responses or now and then
+            if template.samples >= self.warmup and (
+                template.timeout is None or template.samples % 8 == 0 or self.factor * latency > template.timeout
+            ):
+                template.timeout = max(self.minimum, self.factor * template.stats.percentile(self.percentile))
+            template.scale = max(1.0, template.scale * 0.5)
+
+    def miss(self, command: str) -> None:
+        """Note a read which failed, e.g. because it exceeded the learned timeout."""
+        with self._lock:
+            template = self._template(command)
+            template.misses += 1
+            if template.timeout is not None:
+                template.scale *= 2.0
+
+    def templates(self) -> dict[str, float | None]:
+        """Learned timeouts by command template."""
+        with self._lock:
+            return {key: template.timeout for key, template in self._templates.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._templates.clear()
@@ -0,0 +1,315 @@
+"""
+This file is part of PyINSTR.
+
+:copyright: 2025 by Marco Schott.
+:license: MIT, see LICENSE for more details.
+"""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from itertools import batched
+from typing import Any
+
+from pyinstr.control import ControlProperty
+from pyinstr.message import (
+    Channel,
+    ChannelProperty,
+    Instrument,
+    MessageProtocol,
+)
+from pyinstr.property import Property
+
+
+@dataclass(frozen=True)
+class ControlNode:
+    """A control property bound to the instrument or channel owning it."""
+
+    path: tuple[str, ...]
+    owner: MessageProtocol
+    control: ControlProperty[Any, Any]
+
+    @property
+    def name(self) -> str:
+        return '.'.join(self.path)
+
+    @property
+    def root(self) -> MessageProtocol:
+        return self.owner.root if isinstance(self.owner, Channel) else self.owner
+
+    def resolve(self, command: str) -> str:
+        """Substitute the channel placeholders of the owner in the command."""
+        return self.owner.resolve(command) if isinstance(self.owner, Channel) else command
+
+    @property
+    def get_command(self) -> str:
+        if self.control.get_cmd is None:
+            raise ValueError(f'Control {self.name} is not readable.')
+        return self.resolve(self.control.get_cmd)
+
+    def read(self) -> Any:
+        return self.control.__get__(self.owner)
+
+    def parse(self, response: str) -> Any:
+        return self.control.parse(self.owner, response)
+
+
+def class_properties(cls: type) -> dict[str, Property[Any, Any]]:
+    """Collect all properties of a class, with the most derived definition taking precedence."""
+    attrs: dict[str, Property[Any, Any]] = {}
+    for base in cls.__mro__:
+        if base is object:
+            continue
+        for key, value in vars(base).items():
+            if key not in attrs and isinstance(value, Property):
+                attrs[key] = value  # type: ignore[reportUnknownArgumentType]
+    return attrs
+
+
+def iter_children(obj: MessageProtocol) -> Iterator[tuple[str, Any]]:
+    """Yield the existing channels (or channel dictionaries) of an instrument or channel."""
+    for name, prop in class_properties(type(obj)).items():
+        if not isinstance(prop, ChannelProperty):
+            continue
+        yield name, prop.__get__(obj)  # type: ignore[reportUnknownMemberType]
+
+
+def iter_controls(obj: MessageProtocol, prefix: tuple[str, ...] = ()) -> Iterator[ControlNode]:
+    """Walk the control tree of an instrument or channel.
+
+    Static channels and channels of ``make_multiple`` are always visited, dynamic channels only if
+    they were already created.
+    """
+    for name, prop in class_properties(type(obj)).items():
+        if isinstance(prop, ControlProperty):
+            yield ControlNode((*prefix, name), obj, prop)  # type: ignore[reportUnknownArgumentType]
+    for name, child in iter_children(obj):
+        if isinstance(child, dict):
+            for key, channel in list(child.items()):  # type: ignore[reportUnknownVariableType]
+                yield from iter_controls(channel, (*prefix, name, str(key)))  # type: ignore[reportUnknownArgumentType]
+        else:
+            yield from iter_controls(child, (*prefix, name))
+
+
+def _channel(channels: dict[Any, Any], key: Any) -> Any:
+    # paths are strings, so a channel id like ``1`` of ``make_multiple`` is also found by ``'1'``
+    if key not in channels:
+        for channel_id in list(channels):
+            if str(channel_id) == str(key):
+                return channels[channel_id]
+    return channels[key]
+
+
+def find_control(obj: MessageProtocol, path: str | Sequence[Any]) -> ControlNode:
+    """Find a control by its attribute path, e.g. ``'channel_1.voltage_range'`` or
+    ``('temperature_controls', 'MB1.T1', 'temperature')``."""
+    parts = tuple(path.split('.')) if isinstance(path, str) else tuple(str(part) for part in path)
+    owner: Any = obj
+    for part in parts[:-1]:
+        owner = _channel(owner, part) if isinstance(owner, dict) else getattr(owner, part)
+    if isinstance(owner, dict):
+        raise ValueError(f'Path {".".join(parts)} does not end in a control.')
+    prop = class_properties(type(owner)).get(parts[-1])
+    if not isinstance(prop, ControlProperty):
+        raise ValueError(f'{parts[-1]} is not a control of {type(owner).__name__}.')
+    return ControlNode(parts, owner, prop)  # type: ignore[reportUnknownArgumentType]
+
+
+def _rank(obj: Any, name: str) -> int:
+    order: tuple[str, ...] = getattr(type(obj), 'configure_order', ('*',))
+    if name in order:
+        return order.index(name)
+    return order.index('*') if '*' in order else len(order)
+
+
+def _flatten(
+    obj: MessageProtocol,
+    settings: dict[Any, Any],
+    prefix: tuple[str, ...],
+    ranks: tuple[int, ...],
+) -> list[tuple[tuple[int, ...], ControlNode, Any]]:
+    entries: list[tuple[tuple[int, ...], ControlNode, Any]] = []
+    props = class_properties(type(obj))
+    for key, value in settings.items():
+        path = (*prefix, str(key))
+        rank = (*ranks, _rank(obj, key))
+        prop = props.get(key)
+        if isinstance(prop, ControlProperty):
+            entries.append((rank, ControlNode(path, obj, prop), value))  # type: ignore[reportUnknownArgumentType]
+        elif isinstance(prop, ChannelProperty) and isinstance(value, dict):
+            child = prop.__get__(obj)  # type: ignore[reportUnknownMemberType]
+            if isinstance(child, dict):
+                for channel_id, channel_settings in value.items():  # type: ignore[reportUnknownVariableType]
+                    channel_path = (*path, str(channel_id))  # type: ignore[reportUnknownArgumentType]
+                    entries.extend(_flatten(_channel(child, channel_id), channel_settings, channel_path, rank))  # type: ignore[reportUnknownArgumentType]
+            else:
+                entries.extend(_flatten(child, value, path, rank))  # type: ignore[reportUnknownArgumentType]
+        else:
+            raise ValueError(f'{".".join(path)} is neither a control nor a channel of {type(obj).__name__}.')
+    return entries
+
+
+def flatten_settings(obj: MessageProtocol, settings: dict[Any, Any]) -> list[tuple[ControlNode, Any]]:
+    """Resolve a nested dictionary of control values into control nodes.
+
+    The entries are sorted by the ``configure_order`` of the instrument and its channels, entries of
+    equal rank keep the order of the dictionary.
+    """
+    entries = _flatten(obj, settings, (), ())
+    entries.sort(key=lambda entry: entry[0])
+    return [(node, value) for _, node, value in entries]
+
+
+def _matches(path: tuple[str, ...], patterns: Sequence[str]) -> bool:
+    # a pattern matching a channel also matches all its controls
+    names = ['.'.join(path[:i]) for i in range(1, len(path) + 1)]
+    return any(fnmatchcase(name, pattern) for name in names for pattern in patterns)
+
+
+def select_controls(
+    obj: MessageProtocol,
+    include: Sequence[str] | None = None,
+    exclude: Sequence[str] | None = None,
+) -> list[ControlNode]:
+    """Select the controls of a tree by glob patterns on their dotted path."""
+    nodes: list[ControlNode] = []
+    for node in iter_controls(obj):
+        if include is not None and not _matches(node.path, include):
+            continue
+        if exclude is not None and _matches(node.path, exclude):
+            continue
+        nodes.append(node)
+    return nodes
+
+
+def _timeout(nodes: Sequence[ControlNode], indices: Sequence[int]) -> float | None:
+    # a batch waits as long as its slowest control
+    timeouts = [nodes[i].control.timeout for i in indices]
+    return None if None in timeouts else max(timeouts)  # type: ignore[type-var]
+
+
+def read_controls(nodes: Sequence[ControlNode]) -> list[Any]:
+    """Read the controls using batched queries per instrument.
+
+    Errors are returned in place of the value. If a batch fails, its controls are read individually
+    to find the failing ones.
+    """
+    from pyinstr.virtual import is_virtual
+
+    results: list[Any] = [None] * len(nodes)
+    groups: dict[int, list[int]] = {}
+    for index, node in enumerate(nodes):
+        root = node.root
+        if isinstance(root, Instrument) and not is_virtual(root):
+            groups.setdefault(id(root), []).append(index)
+        else:
+            try:
+                results[index] = node.read()
+            except Exception as exc:
+                results[index] = exc
+
+    for indices in groups.values():
+        root: Instrument = nodes[indices[0]].root  # type: ignore[reportAssignmentType]
+        for chunk in batched(indices, root.batch_size):
+            try:
+                commands = [nodes[i].get_command for i in chunk]
+                responses: list[str | None] = list(
+                    root.query_many(
+                        commands,
+                        coalesce=all(nodes[i].control.snapshot for i in chunk),
+                        timeout=_timeout(nodes, chunk),
+                    )
+                )
+            except Exception:
+                responses = [None] * len(chunk)
+            for index, response in zip(chunk, responses, strict=True):
+                node = nodes[index]
+                try:
+                    results[index] = node.read() if response is None else node.parse(response)
+                except Exception as exc:
+                    results[index] = exc
+    return results
+
+
+def snapshot(
+    obj: MessageProtocol,
+    include: Sequence[str] | None = None,
+    exclude: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """Read every readable control of an instrument tree into a nested dictionary.
+
+    Controls can be selected with glob patterns on their dotted path (e.g. ``'channel_*'`` or
+    ``'*.temperature'``). Controls whose reading has side effects (e.g. ``read``) are always skipped.
+    Failing controls hold the raised exception instead of a value.
+    """
+    nodes = [node for node in select_controls(obj, include, exclude) if node.control.snapshot]
+    result: dict[str, Any] = {}
+    for node, value in zip(nodes, read_controls(nodes), strict=True):
+        entry = result
+        for part in node.path[:-1]:
+            entry = entry.setdefault(part, {})
+        entry[node.path[-1]] = value
+    return result
+
+
+def _apply(root: Instrument, nodes: Sequence[ControlNode], commands: Sequence[str]) -> None:
+    # runs of plain writes are concatenated, controls answering to a set are queried
+    start = 0
+    while start < len(nodes):
+        expects_response = nodes[start].control.expects_response
+        stop = start
+        while stop < len(nodes) and nodes[stop].control.expects_response == expects_response:
+            stop += 1
+        if expects_response:
+            responses = root.query_many(commands[start:stop])
+            for node, response in zip(nodes[start:stop], responses, strict=True):
+                node.control.acknowledge(node.owner, response)
+        else:
+            root.send_many(commands[start:stop])
+        start = stop
+
+
+def configure(obj: MessageProtocol, settings: dict[Any, Any], diff: bool = False) -> dict[str, Any]:
+    """Apply a nested dictionary of control values to an instrument tree.
+
+    All values are validated before anything is sent. With ``diff`` the current state is read first
+    and only changed controls are written. The commands are sent in the ``configure_order`` of the
+    instrument and its channels, concatenated where supported, and followed by a single completion
+    query. Returns the applied values by their dotted path.
+    """
+    from pyinstr.virtual import is_virtual
+
+    entries = flatten_settings(obj, settings)
+    commands: list[str] = []
+    errors: list[str] = []
+    for node, value in entries:
+        try:
+            commands.append(node.resolve(node.control.encode(node.owner, value)))
+        except Exception as exc:
+            errors.append(f'{node.name}: {exc}')
+    if errors:
+        raise ValueError('Invalid configuration:\n' + '\n'.join(errors))
+
+    if diff:
+        readable = [index for index, (node, _) in enumerate(entries) if node.control.get_cmd is not None]
+        current = read_controls([entries[index][0] for index in readable])
+        unchanged = {index for index, value in zip(readable, current, strict=True) if value == entries[index][1]}
+        entries = [entry for index, entry in enumerate(entries) if index not in unchanged]
+        commands = [command for index, command in enumerate(commands) if index not in unchanged]
+
+    nodes = [node for node, _ in entries]
+    roots: dict[int, list[int]] = {}
+    for index, node in enumerate(nodes):
+        roots.setdefault(id(node.root), []).append(index)
+    for indices in roots.values():
+        root = nodes[indices[0]].root
+        if not isinstance(root, Instrument) or is_virtual(root):
+            for index in indices:
+                entries[index][0].control.__set__(nodes[index].owner, entries[index][1])
+            continue
+        _apply(root, [nodes[index] for index in indices], [commands[index] for index in indices])
+        for index in indices:
+            nodes[index].control.written(nodes[index].owner, entries[index][1])
+        if root.completion_query is not None:
+            root.query(root.completion_query)
+    return {node.name: value for node, value in entries}
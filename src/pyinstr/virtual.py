@@ -24,6 +24,7 @@ from pyinstr.message import (
     SingleChannelFactory,
 )
 from pyinstr.property import Property
+from pyinstr.scheduler import IOScheduler
 from pyinstr.type_registry import DefaultTypeRegistry
 
 default_registry = DefaultTypeRegistry()
@@ -180,10 +181,11 @@ def inject_real(
     inst: Instrument,
     adapter: Adapter,
     context: ContextProtocol[Any] = _NullContext,
+    scheduler: IOScheduler | None = None,
 ) -> None:
     if not is_virtual(inst):  # is already real
         return
     inst.close()
     # remap the instrument and all its channels back to the base
     _inject_instance(inst.__class__.__base__, inst)  # type: ignore[reportArgumentType]
-    inst.__init__(adapter, context)
+    inst.__init__(adapter, context, scheduler)